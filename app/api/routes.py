@@ -1,32 +1,87 @@
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.job import JobCreateRequest, JobCreateResponse, JobStatusResponse, ErrorResponse
+import asyncio
+import json
+from collections import Counter, defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import uuid4
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from tortoise.transactions import in_transaction
+from app.schemas.job import (
+    JobCreateRequest,
+    JobCreateResponse,
+    JobBatchCreateRequest,
+    JobBatchCreateResponse,
+    JobStatusResponse,
+    JobStatusBatchRequest,
+    JobStatusBatchResponse,
+    ErrorResponse
+)
 from app.models.job import Job, JobStatus
-from app.tasks.media_generation import start_media_generation_workflow
+from app.models.outbox import OutboxEntry
+from app.tasks.media_generation import start_media_generation_workflow, start_media_generation_workflows
 from app.services.storage_service import storage_service
+from app.services.admission_control import admission_controller
+from app.services.job_status_cache import job_status_cache, make_etag
+from app.services.outbox_dispatcher import outbox_dispatcher
+from app.services.job_events import job_event_relay, is_terminal_event, TERMINAL_STATUSES
+from app.services.replicate_service import publish_prediction_update
+from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _admit_jobs(jobs_by_model: Dict[str, int]):
+    """Reject the request with 429 and Retry-After when admission control is over its limits."""
+    reason = await admission_controller.admit(jobs_by_model)
+    if reason is not None:
+        logger.warning(f"Rejected {sum(jobs_by_model.values())} jobs: {reason}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"{reason}. Retry later.",
+            headers={"Retry-After": str(settings.admission_retry_after)}
+        )
+
+
+def _outbox_enabled() -> bool:
+    return settings.job_dispatch_mode.lower() == "outbox"
+
+
 @router.post("/generate", response_model=JobCreateResponse)
 async def create_generation_job(request: JobCreateRequest):
+    """
+    Create a generation job.
+    
+    The task id is generated up front so the job is written once. In outbox mode the
+    job and its outbox entry are committed in one transaction and the outbox dispatcher
+    publishes the workflow, so the request only waits for that one commit.
+    """
+    await _admit_jobs({request.model: 1})
+    
     try:
-        job = await Job.create(
-            model=request.model,
-            prompt=request.prompt,
-            num_outputs=request.num_outputs,
-            seed=request.seed,
-            output_format=request.output_format,
-            celery_task_id="temp"  # Will be updated after task creation
-        )
-        
-        task = start_media_generation_workflow(job.id)
+        task_id = str(uuid4())
+        job_fields = {
+            "model": request.model,
+            "prompt": request.prompt,
+            "num_outputs": request.num_outputs,
+            "seed": request.seed,
+            "output_format": request.output_format,
+            "celery_task_id": task_id
+        }
         
-        job.celery_task_id = task.id
-        await job.save()
+        if _outbox_enabled():
+            async with in_transaction():
+                job = await Job.create(**job_fields)
+                await OutboxEntry.create(job_id=job.id, task_id=task_id, priority=request.priority)
+            outbox_dispatcher.notify()
+        else:
+            job = await Job.create(**job_fields)
+            start_media_generation_workflow(job.id, task_id=task_id, priority=request.priority)
         
-        logger.info(f"Created job {job.id} with task {task.id}")
+        logger.info(f"Created job {job.id} with task {task_id}")
         
         return JobCreateResponse(
             job_id=job.id,
@@ -42,84 +97,203 @@ async def create_generation_job(request: JobCreateRequest):
         )
 
 
-@router.get("/status/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: int):
+@router.post("/generate:batch", response_model=JobBatchCreateResponse)
+async def create_generation_jobs_batch(request: JobBatchCreateRequest):
+    """
+    Create many generation jobs at once.
+    
+    Task ids are generated up front so each job is written exactly once with one
+    bulk insert, and all workflows are published over a single broker connection.
+    In outbox mode the outbox entries are committed with the jobs and the outbox
+    dispatcher publishes them. The batch is admitted or rejected as a whole.
+    """
+    await _admit_jobs(Counter(job_request.model for job_request in request.jobs))
+    
     try:
-        job = await Job.get_or_none(id=job_id)
+        task_ids = [str(uuid4()) for _ in request.jobs]
         
-        if not job:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Job {job_id} not found"
+        async with in_transaction():
+            await Job.bulk_create([
+                Job(
+                    model=job_request.model,
+                    prompt=job_request.prompt,
+                    num_outputs=job_request.num_outputs,
+                    seed=job_request.seed,
+                    output_format=job_request.output_format,
+                    celery_task_id=task_id
+                )
+                for job_request, task_id in zip(request.jobs, task_ids)
+            ], batch_size=settings.generate_batch_insert_size)
+            
+            job_ids_by_task_id = dict(
+                await Job.filter(celery_task_id__in=task_ids).values_list("celery_task_id", "id")
             )
+            jobs = [
+                (job_ids_by_task_id[task_id], task_id, job_request.priority)
+                for job_request, task_id in zip(request.jobs, task_ids)
+            ]
+            
+            if _outbox_enabled():
+                await OutboxEntry.bulk_create([
+                    OutboxEntry(job_id=job_id, task_id=task_id, priority=priority)
+                    for job_id, task_id, priority in jobs
+                ], batch_size=settings.generate_batch_insert_size)
         
-        media = []
-        
-        # Query child jobs (persist_media_to_s3 tasks)
-        child_jobs = await Job.filter(parent_id=job_id).all()
-        
-        if child_jobs:
-            # Use child jobs to build media array with status information
-            for child_job in child_jobs:
-                # Get media_url from the media field
-                media_url = None
-                if child_job.media and isinstance(child_job.media, list) and len(child_job.media) > 0:
-                    media_url = child_job.media[0].get('media_url')
-                
-                media_item = {
-                    'media_url': media_url,
-                    'status': child_job.status,
-                    'error_message': child_job.error_message,
-                    'started_at': child_job.started_at,
-                    'completed_at': child_job.completed_at
-                }
-                
-                # Add S3 info and presigned URL if available
-                if child_job.media and isinstance(child_job.media, list) and len(child_job.media) > 0:
-                    s3_key = child_job.media[0].get('s3_key')
-                    if s3_key:
-                        media_item['s3_key'] = s3_key
-                        try:
-                            presigned_url = storage_service.get_presigned_url(s3_key)
-                            media_item['presigned_media_url'] = presigned_url
-                        except Exception as e:
-                            logger.error(f"Error generating presigned URL for child job {child_job.id}: {str(e)}")
-                            media_item['presigned_media_url'] = None
-                
-                media.append(media_item)
+        if _outbox_enabled():
+            outbox_dispatcher.notify()
         else:
-            # Fallback to original media field if no child jobs exist
-            if job.media and isinstance(job.media, list):
-                for media_item in job.media:
+            # Publishing is blocking broker I/O, so keep it off the event loop
+            await run_in_threadpool(start_media_generation_workflows, jobs)
+        
+        logger.info(f"Created {len(jobs)} jobs in batch")
+        
+        return JobBatchCreateResponse(
+            job_ids=[job_id for job_id, _, _ in jobs],
+            status=JobStatus.PENDING,
+            message=f"{len(jobs)} jobs created and queued for processing"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error creating batch of generation jobs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create jobs: {str(e)}"
+        )
+
+
+async def _build_media(job: Job, child_jobs: List[Job]) -> List[dict]:
+    media = []
+    
+    if child_jobs:
+        # Use child jobs to build media array with status information
+        for child_job in child_jobs:
+            # Get media_url from the media field
+            media_url = None
+            if child_job.media and isinstance(child_job.media, list) and len(child_job.media) > 0:
+                media_url = child_job.media[0].get('media_url')
+            
+            media_item = {
+                'media_url': media_url,
+                'status': child_job.status,
+                'error_message': child_job.error_message,
+                'started_at': child_job.started_at,
+                'completed_at': child_job.completed_at
+            }
+            
+            # Add S3 info and presigned URL if available
+            if child_job.media and isinstance(child_job.media, list) and len(child_job.media) > 0:
+                s3_key = child_job.media[0].get('s3_key')
+                if s3_key:
+                    media_item['s3_key'] = s3_key
                     try:
-                        presigned_url = storage_service.get_presigned_url(media_item['s3_key'])
-                        media.append({
-                            'media_url': media_item['media_url'],
-                            'presigned_media_url': presigned_url
-                        })
+                        presigned_url = await storage_service.get_presigned_url(s3_key)
+                        media_item['presigned_media_url'] = presigned_url
                     except Exception as e:
-                        logger.error(f"Error generating presigned URL for job {job_id}: {str(e)}")
-                        media.append({
-                            'media_url': media_item.get('media_url'),
-                            'presigned_media_url': None
-                        })
+                        logger.error(f"Error generating presigned URL for child job {child_job.id}: {str(e)}")
+                        media_item['presigned_media_url'] = None
+            
+            media.append(media_item)
+    else:
+        # Fallback to original media field if no child jobs exist
+        if job.media and isinstance(job.media, list):
+            for media_item in job.media:
+                try:
+                    presigned_url = await storage_service.get_presigned_url(media_item['s3_key'])
+                    media.append({
+                        'media_url': media_item['media_url'],
+                        'presigned_media_url': presigned_url
+                    })
+                except Exception as e:
+                    logger.error(f"Error generating presigned URL for job {job.id}: {str(e)}")
+                    media.append({
+                        'media_url': media_item.get('media_url'),
+                        'presigned_media_url': None
+                    })
+    
+    return media
+
+
+async def _build_status_response(job: Job, child_jobs: List[Job]) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        model=job.model,
+        prompt=job.prompt,
+        num_outputs=job.num_outputs,
+        seed=job.seed,
+        output_format=job.output_format,
+        media=await _build_media(job, child_jobs),
+        error_message=job.error_message,
+        retry_count=job.retry_count,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at
+    )
+
+
+def _serialize(data: Any) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+
+
+async def _serialize_status_responses(responses: List[JobStatusResponse]) -> Dict[int, bytes]:
+    """
+    Serialize status responses by job id, caching those of completed jobs.
+
+    A failed parent isn't cached: the uploads it dispatched may still be moving
+    its children along, and its response with them.
+    """
+    bodies = {response.job_id: _serialize(response.model_dump()) for response in responses}
+    await job_status_cache.set_many({
+        response.job_id: bodies[response.job_id]
+        for response in responses
+        if response.status == JobStatus.COMPLETED
+    })
+    return bodies
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+@router.get("/status/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: int, if_none_match: Optional[str] = Header(default=None)):
+    """
+    Get the status of a job.
+    
+    Completed jobs are served from the job status cache without querying
+    the database. Responses carry an ETag, and polls sending it back in If-None-Match
+    get an empty 304 while the response is unchanged.
+    """
+    try:
+        cached = await job_status_cache.get(job_id)
         
-        return JobStatusResponse(
-            job_id=job.id,
-            status=job.status,
-            model=job.model,
-            prompt=job.prompt,
-            num_outputs=job.num_outputs,
-            seed=job.seed,
-            output_format=job.output_format,
-            media=media,
-            error_message=job.error_message,
-            retry_count=job.retry_count,
-            created_at=job.created_at,
-            updated_at=job.updated_at,
-            started_at=job.started_at,
-            completed_at=job.completed_at
-        )
+        if cached is not None:
+            body, etag = cached
+        else:
+            job = await Job.get_or_none(id=job_id)
+            
+            if not job:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Job {job_id} not found"
+                )
+            
+            # Query child jobs (persist_media_to_s3 tasks)
+            child_jobs = await Job.filter(parent_id=job_id).all()
+            
+            response = await _build_status_response(job, child_jobs)
+            body = (await _serialize_status_responses([response]))[job_id]
+            etag = make_etag(body)
+        
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except HTTPException:
         raise
@@ -128,4 +302,138 @@ async def get_job_status(job_id: int):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get job status: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/status:batch", response_model=JobStatusBatchResponse)
+async def get_job_status_batch(request: JobStatusBatchRequest):
+    """
+    Get the status of many jobs with one query for the parents and one for all their children.
+    
+    Completed jobs come from the job status cache, only the others are queried.
+    """
+    try:
+        job_ids = list(dict.fromkeys(request.job_ids))
+        
+        bodies = {job_id: body for job_id, (body, _) in (await job_status_cache.get_many(job_ids)).items()}
+        uncached_ids = [job_id for job_id in job_ids if job_id not in bodies]
+        
+        jobs = {job.id: job for job in await Job.filter(id__in=uncached_ids).all()} if uncached_ids else {}
+        
+        child_jobs_by_parent: Dict[int, List[Job]] = defaultdict(list)
+        if jobs:
+            for child_job in await Job.filter(parent_id__in=list(jobs)).order_by("id").all():
+                child_jobs_by_parent[child_job.parent_id].append(child_job)
+        
+        responses = await asyncio.gather(*(
+            _build_status_response(job, child_jobs_by_parent.get(job_id, []))
+            for job_id, job in jobs.items()
+        ))
+        bodies.update(await _serialize_status_responses(responses))
+        
+        # Splice the serialized job responses into the JobStatusBatchResponse body
+        content = b''.join([
+            b'{"jobs":[',
+            b','.join(bodies[job_id] for job_id in job_ids if job_id in bodies),
+            b'],"not_found":',
+            _serialize([job_id for job_id in job_ids if job_id not in bodies]),
+            b'}'
+        ])
+        return Response(content=content, media_type="application/json")
+        
+    except Exception as e:
+        logger.error(f"Error getting batch job status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get job status: {str(e)}"
+        )
+
+
+async def _job_event_stream(job_id: int) -> AsyncIterator[Dict]:
+    """
+    Yield a status snapshot of the job followed by its live events until it completes or fails.
+    
+    Yields a heartbeat event whenever no event arrives within job_events_heartbeat_interval
+    so proxies keep the connection open and disconnected clients are noticed.
+    """
+    async with job_event_relay.subscribe(job_id) as events:
+        # Read the current state only after subscribing so no transition is missed
+        job = await Job.get(id=job_id)
+        snapshot = await _build_status_response(job, await Job.filter(parent_id=job_id).all())
+        yield {"type": "status", "job_id": job_id, "status": snapshot.status, "data": snapshot.model_dump(mode="json")}
+        
+        if snapshot.status in TERMINAL_STATUSES:
+            return
+        
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=settings.job_events_heartbeat_interval)
+            except asyncio.TimeoutError:
+                yield {"type": "heartbeat", "job_id": job_id}
+                continue
+            
+            yield event
+            
+            if is_terminal_event(event):
+                return
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: int):
+    """Stream job state transitions as Server-Sent Events."""
+    if not await Job.exists(id=job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    
+    async def _sse():
+        async for event in _job_event_stream(job_id):
+            if event["type"] == "heartbeat":
+                yield ": heartbeat\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        _sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/jobs/{job_id}/ws")
+async def job_events_websocket(websocket: WebSocket, job_id: int):
+    """Stream job state transitions over a WebSocket as JSON messages."""
+    await websocket.accept()
+    
+    if not await Job.exists(id=job_id):
+        await websocket.close(code=4404, reason=f"Job {job_id} not found")
+        return
+    
+    try:
+        async for event in _job_event_stream(job_id):
+            await websocket.send_text(json.dumps(event, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.debug(f"Event stream client for job {job_id} disconnected")
+
+
+@router.post("/webhooks/replicate")
+async def replicate_webhook(prediction: Dict[str, Any]):
+    """Receive Replicate prediction completion webhooks and wake up the waiting worker."""
+    prediction_id = prediction.get("id")
+    if not prediction_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing prediction id"
+        )
+    
+    try:
+        await publish_prediction_update(prediction_id)
+        return {"status": "ok"}
+    except Exception as e:
+        logger.error(f"Error relaying webhook for prediction {prediction_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to relay prediction webhook"
+        )
@@ -1,12 +1,21 @@
 from tortoise import Tortoise
+from tortoise.backends.base.config_generator import expand_db_url
 from app.core.config import settings
 
 
+def get_connection_config(db_url: str) -> dict:
+    """Expand the database URL and apply the configured connection pool sizing."""
+    config = expand_db_url(db_url)
+    config["credentials"]["minsize"] = settings.db_pool_min_size
+    config["credentials"]["maxsize"] = settings.db_pool_max_size
+    return config
+
+
 TORTOISE_ORM = {
-    "connections": {"default": settings.database_url},
+    "connections": {"default": get_connection_config(settings.database_url)},
     "apps": {
         "models": {
-            "models": ["app.models.job", "aerich.models"],
+            "models": ["app.models.job", "app.models.media_object", "app.models.outbox", "aerich.models"],
             "default_connection": "default",
         },
     },
@@ -18,4 +27,4 @@ async def init_db():
 
 
 async def close_db():
-    await Tortoise.close_connections()
\ No newline at end of file
+    await Tortoise.close_connections()
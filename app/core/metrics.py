@@ -0,0 +1,114 @@
+import os
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+
+MEDIA_DOWNLOADS = Counter(
+    "media_downloads_total",
+    "Media downloads by whether they opened a new connection or reused a pooled one",
+    ["connection"]
+)
+
+MEDIA_DOWNLOAD_BYTES = Counter(
+    "media_download_bytes_total",
+    "Bytes downloaded from media origins"
+)
+
+MEDIA_DEDUPE = Counter(
+    "media_dedupe_total",
+    "Persisted media by whether the content was already stored (hit) or written (miss)",
+    ["result"]
+)
+
+S3_REQUEST_DURATION = Histogram(
+    "s3_request_duration_seconds",
+    "S3 client call latency by operation (put_object, upload_part, ...)",
+    ["operation"]
+)
+
+GENERATION_CACHE = Counter(
+    "generation_cache_requests_total",
+    "Generation cache lookups for seeded requests by result",
+    ["result"]
+)
+
+GENERATE_MEDIA_DURATION = Histogram(
+    "generate_media_duration_seconds",
+    "Media generator call latency by model",
+    ["model"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+)
+
+PRESIGNED_URL_CACHE = Counter(
+    "presigned_url_cache_requests_total",
+    "Presigned URL lookups by result (hit, redis_hit or miss)",
+    ["result"]
+)
+
+JOB_STATUS_CACHE = Counter(
+    "job_status_cache_requests_total",
+    "Job status lookups by result (hit, redis_hit or miss)",
+    ["result"]
+)
+
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Job submissions by admission control result (admitted or rejected)",
+    ["result"]
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request latency until the response starts, by route",
+    ["method", "route", "status"]
+)
+
+TASK_QUEUE_TIME = Histogram(
+    "celery_task_queue_seconds",
+    "Time a task waited in the broker before a worker started it, by task",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+)
+
+TASK_RETRIES = Counter(
+    "celery_task_retries_total",
+    "Task retries scheduled, by task",
+    ["task"]
+)
+
+OUTBOX_DISPATCHED = Counter(
+    "outbox_dispatched_total",
+    "Workflows published from the outbox"
+)
+
+OUTBOX_DISPATCH_DELAY = Histogram(
+    "outbox_dispatch_delay_seconds",
+    "Time from committing a job's outbox entry to publishing its workflow",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+JOB_WRITE_BUFFER = Counter(
+    "job_write_buffer_writes_total",
+    "Buffered job writes by outcome: batched (flushed), merged (into a synchronous write) or dropped",
+    ["result"]
+)
+
+JOBS_BY_STATUS = Gauge(
+    "jobs",
+    "Parent jobs by status",
+    ["status"],
+    multiprocess_mode="livemostrecent"
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registry to expose on a metrics endpoint.
+
+    With PROMETHEUS_MULTIPROC_DIR set (prefork Celery workers, multi-process API
+    servers), metrics are aggregated across all processes of the service.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
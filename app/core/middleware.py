@@ -0,0 +1,49 @@
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import HTTP_REQUEST_DURATION
+
+
+class RequestMetricsMiddleware:
+    """
+    Records HTTP request latency by route template.
+
+    Latency is measured until the response starts rather than until the body is sent,
+    so long-lived streaming responses (job events over SSE) don't skew the histogram.
+    Plain ASGI instead of BaseHTTPMiddleware to keep the per-request overhead small.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _route(self, scope: Scope) -> str:
+        # FastAPI routes record themselves in the scope once matched
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+
+        # Other routes (mounts, plain Starlette routes) are matched again here
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        # Unmatched paths share one label so scanners can't blow up the label cardinality
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def _send(message: Message):
+            if message["type"] == "http.response.start":
+                HTTP_REQUEST_DURATION.labels(
+                    method=scope["method"],
+                    route=self._route(scope),
+                    status=str(message["status"])
+                ).observe(time.perf_counter() - start)
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,31 @@
+import asyncio
+from typing import Optional
+import redis.asyncio as redis
+from app.core.config import settings
+
+
+# redis-py's asyncio connections are bound to the event loop they were opened on,
+# so the shared client is created lazily per loop (API loop or worker loop).
+_client: Optional[redis.Redis] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the process-wide async Redis client for the running event loop."""
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = redis.from_url(settings.redis_url)
+        _client_loop = loop
+
+    return _client
+
+
+async def close_redis():
+    global _client, _client_loop
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
@@ -0,0 +1,97 @@
+import logging
+import os
+from typing import Optional
+from opentelemetry import trace
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_provider = None
+
+
+def _build_exporter():
+    exporter = settings.tracing_exporter.lower()
+
+    if exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        # One JSON span per line, appended, so several processes can share the file
+        return ConsoleSpanExporter(
+            out=open(settings.tracing_file_path, "a", buffering=1),
+            formatter=lambda span: span.to_json(indent=None) + os.linesep
+        )
+
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint, insecure=True)
+
+
+def setup_tracing(service_name: str):
+    """
+    Configure OpenTelemetry tracing for this process. No-op unless TRACING_ENABLED.
+
+    Instruments asyncpg (every Tortoise query), httpx (provider calls and media
+    downloads), botocore (S3 calls) and Celery. The Celery instrumentation carries
+    the trace context in the task message headers, so a job's chain, chord and
+    uploads all land in the trace started by its API request.
+
+    Celery workers must call this in each pool process after the fork, since the
+    span processor's export thread doesn't survive it.
+    """
+    global _provider
+
+    if not settings.tracing_enabled or _provider is not None:
+        return
+
+    from opentelemetry.instrumentation.asyncpg import AsyncPGInstrumentor
+    from opentelemetry.instrumentation.botocore import BotocoreInstrumentor
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio))
+    )
+    provider.add_span_processor(BatchSpanProcessor(_build_exporter()))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+
+    AsyncPGInstrumentor().instrument()
+    HTTPXClientInstrumentor().instrument()
+    BotocoreInstrumentor().instrument()
+    CeleryInstrumentor().instrument()
+
+    logger.info(f"Tracing enabled for {service_name} with the {settings.tracing_exporter} exporter")
+
+
+def instrument_app(app):
+    """Create a server span for every API request, the root of each job's trace."""
+    if not settings.tracing_enabled:
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics,health")
+
+
+def shutdown_tracing():
+    """Flush pending spans. Called on app and worker process shutdown."""
+    global _provider
+
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def get_tracer(name: Optional[str] = None) -> trace.Tracer:
+    """Tracer for custom spans. Spans are no-ops while tracing is disabled."""
+    return trace.get_tracer(name or __name__)
@@ -1,13 +1,29 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from tortoise.functions import Count
+from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.metrics import JOBS_BY_STATUS, metrics_registry
+from app.core.middleware import RequestMetricsMiddleware
+from app.core.tracing import setup_tracing, instrument_app, shutdown_tracing
+from app.core.redis import close_redis
 from app.core.logging import setup_logging
 from app.api.routes import router
+from app.services.storage_service import storage_service
+from app.services.job_events import job_event_relay
+from app.services.admission_control import admission_controller
+from app.services.outbox_dispatcher import outbox_dispatcher
+from app.models.job import Job, JobStatus
 import logging
 import os
 
 setup_logging()
+setup_tracing(f"{settings.tracing_service_name}-api")
 logger = logging.getLogger(__name__)
 
 
@@ -15,18 +31,28 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Starting up application")
     await init_db()
+    outbox_dispatcher.start()
     yield
     logger.info("Shutting down application")
+    await outbox_dispatcher.close()
+    await job_event_relay.close()
+    await storage_service.close()
+    await admission_controller.close()
+    await close_redis()
     await close_db()
+    shutdown_tracing()
 
 
 app = FastAPI(
     title="Media Generation Microservice",
     description="Asynchronous media generation using Replicate API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+app.add_middleware(RequestMetricsMiddleware)
+instrument_app(app)
 app.include_router(router, prefix="/api/v1")
 
 # Mount static files
@@ -42,4 +68,38 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+_jobs_by_status_lock = asyncio.Lock()
+_jobs_by_status_refreshed_at = 0.0
+
+
+async def _update_jobs_by_status():
+    """
+    Refresh the jobs_by_status gauge at most every jobs_by_status_metrics_ttl seconds.
+
+    Counting scans the parent jobs, far too much work to repeat on every scrape, so
+    scrapes in between serve the last counts.
+    """
+    global _jobs_by_status_refreshed_at
+
+    async with _jobs_by_status_lock:
+        if time.monotonic() - _jobs_by_status_refreshed_at < settings.jobs_by_status_metrics_ttl:
+            return
+
+        rows = await Job.filter(parent_id=None).annotate(count=Count("id")).group_by("status").values_list("status", "count")
+        counts = {JobStatus(job_status): count for job_status, count in rows}
+        for job_status in JobStatus:
+            JOBS_BY_STATUS.labels(status=job_status.value).set(counts.get(job_status, 0))
+        _jobs_by_status_refreshed_at = time.monotonic()
+
+
+@app.get("/metrics")
+async def metrics():
+    try:
+        await _update_jobs_by_status()
+    except Exception as e:
+        logger.error(f"Failed to count jobs by status: {str(e)}")
+    
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
@@ -28,6 +28,8 @@ class Job(Model):
     media = fields.JSONField(null=True)
     error_message = fields.TextField(null=True)
     retry_count = fields.IntField(default=0)
+    # Fused workflow fan-in counter: child uploads still running for this parent
+    pending_children = fields.IntField(null=True)
     
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
@@ -36,6 +38,14 @@ class Job(Model):
     
     class Meta:
         table = "jobs"
+        indexes = (
+            ("parent_id",),
+            ("status", "created_at"),
+            ("parent_id", "status"),
+        )
+        # Child jobs are also unique on (parent_id, MD5(media->0->>'media_url')) WHERE
+        # parent_id IS NOT NULL (uidx_jobs_parent_media_url). That is a partial expression
+        # index on the url's hash, so it only exists in the migrations.
         
     def __str__(self):
         return f"Job {self.id} - {self.status}"
\ No newline at end of file
@@ -0,0 +1,20 @@
+from tortoise.models import Model
+from tortoise import fields
+
+
+class MediaObject(Model):
+    """Content-addressed index of media stored in S3, used to skip re-uploading identical bytes."""
+    
+    id = fields.IntField(pk=True)
+    sha256 = fields.CharField(max_length=64, unique=True)
+    s3_key = fields.TextField()
+    size = fields.BigIntField()
+    content_type = fields.CharField(max_length=255, null=True)
+    
+    created_at = fields.DatetimeField(auto_now_add=True)
+    
+    class Meta:
+        table = "media_objects"
+        
+    def __str__(self):
+        return f"MediaObject {self.sha256} - {self.s3_key}"
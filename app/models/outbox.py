@@ -0,0 +1,19 @@
+from tortoise.models import Model
+from tortoise import fields
+
+
+class OutboxEntry(Model):
+    """Workflow dispatch committed together with its job, published to Celery by the outbox dispatcher."""
+    
+    id = fields.BigIntField(pk=True)
+    job_id = fields.IntField()
+    task_id = fields.CharField(max_length=255)
+    priority = fields.IntField(null=True)
+    
+    created_at = fields.DatetimeField(auto_now_add=True)
+    
+    class Meta:
+        table = "workflow_outbox"
+        
+    def __str__(self):
+        return f"OutboxEntry {self.id} - job {self.job_id}"
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from app.core.config import settings
 from app.models.job import JobStatus
 
 
@@ -10,6 +11,12 @@ class JobCreateRequest(BaseModel):
     num_outputs: int = Field(default=1, ge=1, le=10, description="Number of outputs to generate")
     seed: Optional[int] = Field(default=None, description="Seed for reproducibility")
     output_format: Optional[str] = Field(default=None, description="Output format (jpg, png, wav, mp3, etc.)")
+    priority: int = Field(
+        default=settings.job_default_priority,
+        ge=0,
+        le=9,
+        description="Queue priority from 0 to 9, higher is processed first"
+    )
 
 
 class JobCreateResponse(BaseModel):
@@ -18,6 +25,21 @@ class JobCreateResponse(BaseModel):
     message: str
 
 
+class JobBatchCreateRequest(BaseModel):
+    jobs: List[JobCreateRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.generate_batch_max_jobs,
+        description="Jobs to create"
+    )
+
+
+class JobBatchCreateResponse(BaseModel):
+    job_ids: List[int]
+    status: JobStatus
+    message: str
+
+
 class JobStatusResponse(BaseModel):
     job_id: int
     status: JobStatus
@@ -35,6 +57,20 @@ class JobStatusResponse(BaseModel):
     completed_at: Optional[datetime]
 
 
+class JobStatusBatchRequest(BaseModel):
+    job_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.status_batch_max_ids,
+        description="Ids of the jobs to look up"
+    )
+
+
+class JobStatusBatchResponse(BaseModel):
+    jobs: List[JobStatusResponse]
+    not_found: List[int]
+
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
\ No newline at end of file
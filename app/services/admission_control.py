@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+import redis.asyncio as redis
+from kombu.transport.redis import Channel
+from tortoise.functions import Count
+from app.core.config import settings
+from app.core.metrics import ADMISSION_DECISIONS
+from app.models.job import Job, JobStatus
+from app.tasks.celery_app import GENERATION_QUEUE, MAX_JOB_PRIORITY
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT_STATUSES = [JobStatus.PENDING, JobStatus.PROCESSING, JobStatus.RETRY]
+
+
+class AdmissionController:
+    """
+    Admission control for new generation jobs.
+
+    Rejects new work once the generation queue in the broker or the number of
+    in-flight parent jobs passes its configured limit, globally or per model, so
+    latency stays bounded under overload instead of the queue growing without limit.
+
+    Both numbers are read at most every admission_stats_ttl seconds per process.
+    Jobs admitted in between are added to the cached counts, so a burst can't
+    overshoot the limits by more than one refresh worth of other replicas' traffic.
+    """
+
+    def __init__(self):
+        self._client: Optional[redis.Redis] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refreshed_at = 0.0
+        self._queue_depth = 0
+        self._in_flight = 0
+        self._in_flight_by_model: Dict[str, int] = {}
+
+    def _get_broker_client(self) -> redis.Redis:
+        loop = asyncio.get_running_loop()
+
+        if self._client is None or self._client_loop is not loop:
+            self._client = redis.from_url(settings.celery_broker_url)
+            self._client_loop = loop
+            self._lock = asyncio.Lock()
+
+        return self._client
+
+    async def _read_queue_depth(self) -> int:
+        # The Redis transport keeps one list per priority level: the bare queue name for
+        # priority 0 and "<queue><sep><priority>" for the others
+        keys = [GENERATION_QUEUE] + [
+            f"{GENERATION_QUEUE}{Channel.sep}{priority}"
+            for priority in range(1, MAX_JOB_PRIORITY + 1)
+        ]
+
+        async with self._get_broker_client().pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.llen(key)
+            return sum(await pipe.execute())
+
+    async def _refresh(self):
+        self._get_broker_client()
+
+        async with self._lock:
+            if time.monotonic() - self._refreshed_at < settings.admission_stats_ttl:
+                return
+
+            counts = await Job.filter(
+                parent_id=None,
+                status__in=IN_FLIGHT_STATUSES
+            ).annotate(count=Count("id")).group_by("model").values("model", "count")
+
+            self._queue_depth = await self._read_queue_depth()
+            self._in_flight_by_model = {row["model"]: row["count"] for row in counts}
+            self._in_flight = sum(self._in_flight_by_model.values())
+            self._refreshed_at = time.monotonic()
+
+    def _check_limits(self, jobs_by_model: Dict[str, int]) -> Optional[str]:
+        total = sum(jobs_by_model.values())
+
+        if self._queue_depth + total > settings.admission_max_queue_depth:
+            return f"Generation queue is full ({self._queue_depth} queued)"
+
+        if self._in_flight + total > settings.admission_max_in_flight_jobs:
+            return f"Too many jobs in flight ({self._in_flight})"
+
+        for model, count in jobs_by_model.items():
+            limit = settings.admission_max_in_flight_jobs_per_model.get(model)
+            in_flight = self._in_flight_by_model.get(model, 0)
+            if limit is not None and in_flight + count > limit:
+                return f"Too many jobs in flight for model {model} ({in_flight})"
+
+        return None
+
+    async def admit(self, jobs_by_model: Dict[str, int]) -> Optional[str]:
+        """
+        Decide whether to accept new jobs.
+
+        Args:
+            jobs_by_model: Number of new jobs per model
+
+        Returns:
+            None if the jobs are admitted, otherwise the reason they were rejected
+        """
+        if not settings.admission_control_enabled:
+            return None
+
+        try:
+            await self._refresh()
+        except Exception as e:
+            # Fail open: an unreadable broker or database shouldn't stop all intake
+            logger.warning(f"Failed to refresh admission control stats: {str(e)}")
+
+        reason = self._check_limits(jobs_by_model)
+        if reason is not None:
+            ADMISSION_DECISIONS.labels(result="rejected").inc()
+            return reason
+
+        total = sum(jobs_by_model.values())
+        self._queue_depth += total
+        self._in_flight += total
+        for model, count in jobs_by_model.items():
+            self._in_flight_by_model[model] = self._in_flight_by_model.get(model, 0) + count
+
+        ADMISSION_DECISIONS.labels(result="admitted").inc()
+        return None
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+
+admission_controller = AdmissionController()
@@ -1,12 +1,59 @@
+import asyncio
 import logging
+import math
+import random
 from typing import List, Optional
+from uuid import uuid4
+from app.core.config import settings
 from app.services.media_generator_service import MediaGeneratorService
+from app.services.synthetic_media import MEDIA_TYPE_EXTENSIONS, SYNTHETIC_SCHEME, synthetic_media_path
 
 logger = logging.getLogger(__name__)
 
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
 
 class FakeMediaGeneratorService(MediaGeneratorService):
-    """Fake implementation of MediaGeneratorService for testing and development."""
+    """
+    Fake implementation of MediaGeneratorService for testing, development and load testing.
+    
+    With FAKE_MEDIA_SOURCE=static (the default) it returns the app's static fake images.
+    For load testing it generates synthetic media instead: FAKE_MEDIA_BYTES objects of
+    FAKE_MEDIA_TYPE, produced in-process by the uploading worker (synthetic) or served
+    by benchmarks.media_origin (origin), so downloads never hit the API container.
+    
+    Every prediction takes a latency drawn from FAKE_MEDIA_LATENCY_DISTRIBUTION around a
+    mean of FAKE_MEDIA_LATENCY seconds, and fails with FAKE_MEDIA_FAILURE_RATE.
+    """
+    
+    def __init__(self):
+        self.source = settings.fake_media_source.lower()
+        if self.source not in ("static", "synthetic", "origin"):
+            logger.warning(f"Unknown fake media source '{self.source}', defaulting to static")
+            self.source = "static"
+        
+        self.latency_distribution = settings.fake_media_latency_distribution.lower()
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            logger.warning(f"Unknown latency distribution '{self.latency_distribution}', defaulting to fixed")
+            self.latency_distribution = "fixed"
+        
+        if settings.fake_media_type not in MEDIA_TYPE_EXTENSIONS:
+            logger.warning(f"Unknown fake media type '{settings.fake_media_type}', serving application/octet-stream")
+    
+    def _sample_latency(self) -> float:
+        mean = settings.fake_media_latency
+        sigma = settings.fake_media_latency_sigma
+        if mean <= 0:
+            return 0.0
+        
+        if self.latency_distribution == "uniform":
+            return random.uniform(mean * max(1 - sigma, 0), mean * (1 + sigma))
+        if self.latency_distribution == "exponential":
+            return random.expovariate(1 / mean)
+        if self.latency_distribution == "lognormal":
+            # Long tailed like real predictions, with mu picked so the mean stays at FAKE_MEDIA_LATENCY
+            return random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
     
     async def generate_media(
         self, 
@@ -19,10 +66,27 @@ class FakeMediaGeneratorService(MediaGeneratorService):
         """
         Generate fake media URLs for testing purposes.
         
-        Returns local static fake image URLs.
+        Returns local static fake image URLs, or synthetic media URLs (see the class docstring).
         """
         logger.info(f"Generating fake media with model {model}, prompt: {prompt}, num_outputs: {num_outputs}")
         
+        latency = self._sample_latency()
+        if latency > 0:
+            await asyncio.sleep(latency)
+        
+        if random.random() < settings.fake_media_failure_rate:
+            raise Exception(f"Fake prediction failed after {latency:.2f}s (FAKE_MEDIA_FAILURE_RATE)")
+        
+        if self.source != "static":
+            base_url = f"{SYNTHETIC_SCHEME}://local" if self.source == "synthetic" else settings.fake_media_origin_url.rstrip("/")
+            path = synthetic_media_path(settings.fake_media_bytes, settings.fake_media_type)
+            # A unique query per output, so every output is a distinct object
+            prediction_id = uuid4().hex
+            fake_urls = [f"{base_url}{path}?prediction={prediction_id}&output={i}" for i in range(num_outputs)]
+            
+            logger.info(f"Generated {len(fake_urls)} synthetic media URLs of {settings.fake_media_bytes} bytes")
+            return fake_urls
+        
         base_url = "http://app:8000"
         fake_image_files = ["fake.jpg", "fake1.jpg", "fake2.jpg"]
         
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import GENERATION_CACHE
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "generation_cache"
+INDEX_KEY = f"{KEY_PREFIX}:index"
+
+
+class GenerationCache:
+    """
+    Cache of completed, deterministic generations.
+
+    A request with a seed always produces the same outputs, so once a job for a given
+    (model, prompt, seed, num_outputs, output_format) has been persisted to S3, later
+    jobs with the same parameters can reuse its S3 keys without calling the provider.
+
+    Entries live in Redis with a TTL. A sorted set of entry keys by insertion time
+    bounds the cache to generation_cache_max_entries by evicting the oldest entries.
+    """
+
+    def make_key(
+        self,
+        model: str,
+        prompt: str,
+        seed: Optional[int],
+        num_outputs: int,
+        output_format: Optional[str]
+    ) -> Optional[str]:
+        """Build the cache key for a request, or None if the request is not cacheable."""
+        if seed is None or not settings.generation_cache_enabled:
+            return None
+
+        params = json.dumps(
+            [model, prompt, seed, num_outputs, output_format],
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+        return f"{KEY_PREFIX}:{hashlib.sha256(params.encode()).hexdigest()}"
+
+    async def get(self, cache_key: Optional[str]) -> Optional[List[Dict]]:
+        """
+        Look up cached media for a request.
+
+        Returns:
+            List of {"media_url", "s3_key"} entries on a hit, otherwise None
+        """
+        if cache_key is None:
+            return None
+
+        try:
+            cached = await get_redis().get(cache_key)
+        except Exception as e:
+            logger.warning(f"Generation cache lookup failed for {cache_key}: {str(e)}")
+            return None
+
+        if cached is None:
+            GENERATION_CACHE.labels(result="miss").inc()
+            return None
+
+        GENERATION_CACHE.labels(result="hit").inc()
+        return json.loads(cached)
+
+    async def set(self, cache_key: Optional[str], media: List[Dict]):
+        """Store the persisted media of a completed job and evict the oldest entries past the size limit."""
+        if cache_key is None or not media:
+            return
+
+        try:
+            client = get_redis()
+
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set(cache_key, json.dumps(media), ex=settings.generation_cache_ttl)
+                pipe.zadd(INDEX_KEY, {cache_key: time.time()})
+                pipe.zcard(INDEX_KEY)
+                _, _, size = await pipe.execute()
+
+            overflow = size - settings.generation_cache_max_entries
+            if overflow > 0:
+                evicted = [key for key, _ in await client.zpopmin(INDEX_KEY, overflow)]
+                if evicted:
+                    await client.delete(*evicted)
+                    logger.debug(f"Evicted {len(evicted)} generation cache entries")
+        except Exception as e:
+            logger.warning(f"Failed to store generation cache entry {cache_key}: {str(e)}")
+
+
+generation_cache = GenerationCache()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.job import JobStatus
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "job_events"
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED}
+
+
+def is_terminal_event(event: Dict) -> bool:
+    """Whether an event ends the job's event stream (the parent job completed or failed)."""
+    return event.get("type") == "job" and event.get("status") in TERMINAL_STATUSES
+
+
+async def publish_job_event(job_id: int, event_type: str, status: JobStatus, **data):
+    """
+    Publish a job state transition to the job's Redis channel.
+
+    Args:
+        job_id: The parent job id. Child upload events are published on the parent's channel.
+        event_type: "job" for parent job transitions, "media" for child upload transitions
+        status: The new status
+        **data: Extra event fields (child_job_id, media_url, s3_key, error_message, ...)
+    """
+    if not settings.job_events_enabled:
+        return
+
+    event = {
+        "type": event_type,
+        "job_id": job_id,
+        "status": status,
+        "timestamp": datetime.utcnow().isoformat(),
+        **data
+    }
+
+    try:
+        await get_redis().publish(f"{CHANNEL_PREFIX}:{job_id}", json.dumps(event, default=str))
+    except Exception as e:
+        # Events are best effort. Clients can always fall back to polling /status.
+        logger.warning(f"Failed to publish {event_type} event for job {job_id}: {str(e)}")
+
+
+class JobEventRelay:
+    """
+    Relays job events from Redis to streaming clients in this API process.
+
+    A single pattern subscription per process receives every job's events and
+    dispatches them to local subscriber queues. Each replica holds one Redis
+    connection no matter how many clients are connected, and every replica sees
+    every event, so fan-out works across replicas.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._reader: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    def _ensure_reader(self):
+        if self._reader is None or self._reader.done():
+            self._ready = asyncio.Event()
+            self._reader = asyncio.create_task(self._read_events())
+
+    async def _read_events(self):
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+                self._ready.set()
+
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                    if message is not None:
+                        self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job event subscription failed, reconnecting: {str(e)}")
+                self._ready.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _dispatch(self, data: bytes):
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.warning(f"Ignoring malformed job event: {data!r}")
+            return
+
+        for queue in self._subscribers.get(event.get("job_id"), ()):
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Subscribe to a job's events. Yields a queue receiving the event dicts."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].add(queue)
+        self._ensure_reader()
+
+        try:
+            # Make sure the pattern subscription is live before the caller reads the
+            # job's current state, so no transition can fall between the two
+            await asyncio.wait_for(self._ready.wait(), timeout=5)
+            yield queue
+        finally:
+            self._subscribers[job_id].discard(queue)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+
+job_event_relay = JobEventRelay()
@@ -0,0 +1,254 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from tortoise import connections, timezone
+from app.models.job import Job, JobStatus
+from app.services.job_write_buffer import JobWriteBuffer
+
+# Statuses a job can still move on from. Completed and failed are terminal: a redelivered
+# or retried task never writes to a finished job again (nor counts it off its parent twice).
+ACTIVE_STATUSES = [JobStatus.PENDING, JobStatus.PROCESSING, JobStatus.RETRY]
+FINISHED_STATUSES = [JobStatus.COMPLETED, JobStatus.FAILED]
+
+
+class JobRepository:
+    """
+    Job state transitions as single-statement UPDATEs.
+
+    Job.get -> update_from_dict -> save costs two round trips per transition and
+    rewrites every column of the row, including the prompt and media. Each method here
+    is one UPDATE that only sets the changed columns (plus updated_at), can be guarded
+    by the job's current status (compare-and-set), and returns the columns the caller
+    needs from the row with RETURNING instead of reading it first.
+
+    Writes nothing waits on can be buffered instead (see start_buffered and
+    JobWriteBuffer). Any synchronous write to a job writes its buffered columns along.
+    """
+
+    def __init__(self):
+        self.write_buffer = JobWriteBuffer(self._write_buffered)
+
+    def _columns(self, names: Sequence[str]) -> str:
+        return ", ".join(f'"{Job._meta.fields_map[name].source_field or name}"' for name in names)
+
+    def _to_python(self, row: Dict[str, Any], names: Sequence[str]) -> Dict[str, Any]:
+        fields_map = Job._meta.fields_map
+        return {name: fields_map[name].to_python_value(row[name]) for name in names}
+
+    def _assignments(self, values: Dict[str, Any], params: List[Any]) -> List[str]:
+        """SET assignments for the given values by field name, appending their parameters."""
+        fields_map = Job._meta.fields_map
+        assignments = []
+        for name, value in values.items():
+            params.append(fields_map[name].to_db_value(value, Job))
+            assignments.append(f"{self._columns([name])} = ${len(params)}")
+        return assignments
+
+    async def _execute(self, query: str, params: List[Any], returning: Sequence[str]) -> Optional[Dict[str, Any]]:
+        rows = await connections.get("default").execute_query_dict(query, params)
+        return self._to_python(rows[0], returning) if rows else None
+
+    async def _execute_update(
+        self,
+        query: str,
+        params: List[Any],
+        returning: Sequence[str],
+        count_off_parent: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run an UPDATE of one job, returning the returning fields of the updated row.
+
+        With count_off_parent, an update that finishes the job also counts it off its
+        parent's pending_children (fused workflow fan-in) in the same statement, so a
+        child is counted exactly once: when its own transition to completed or failed
+        succeeds, and never without it. The row then also has parent_pending_children,
+        the parent's children still pending after it, or None if nothing was counted off.
+        """
+        if not count_off_parent:
+            return await self._execute(f"{query} RETURNING {self._columns(returning or ['id'])}", params, returning)
+
+        table = Job._meta.db_table
+        params.append([status.value for status in FINISHED_STATUSES])
+        selected = returning or ["id"]
+        updated_columns = ", ".join(f'"updated".{self._columns([name])}' for name in selected)
+        rows = await connections.get("default").execute_query_dict(
+            f'WITH "updated" AS ({query} RETURNING {self._columns(list(dict.fromkeys([*selected, "parent_id", "status"])))}), '
+            f'"parent" AS (UPDATE "{table}" AS "parents" SET "pending_children" = "parents"."pending_children" - 1 '
+            f'FROM "updated" WHERE "parents"."id" = "updated"."parent_id" AND "updated"."status" = ANY(${len(params)}) '
+            f'AND "parents"."pending_children" > 0 RETURNING "parents"."pending_children") '
+            f'SELECT {updated_columns}, (SELECT "pending_children" FROM "parent") AS "parent_pending_children" FROM "updated"',
+            params
+        )
+        if not rows:
+            return None
+        return {**self._to_python(rows[0], returning), "parent_pending_children": rows[0]["parent_pending_children"]}
+
+    async def update(
+        self,
+        job_id: int,
+        values: Dict[str, Any],
+        expected_statuses: Optional[List[JobStatus]] = None,
+        returning: Sequence[str] = (),
+        count_off_parent: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Set the given columns of a job in a single UPDATE.
+
+        Args:
+            job_id: The job to update
+            values: Column values by field name. updated_at is always set as well.
+            expected_statuses: Only update the job while its status is one of these
+            returning: Fields to return from the updated row
+            count_off_parent: Count a job this finishes off its parent (see _execute_update)
+
+        Returns:
+            The returning fields of the updated row ({} if none were asked for), or
+            None if the job doesn't exist or its status didn't match
+        """
+        params = []
+        assignments = self._assignments(
+            {**self.write_buffer.pop(job_id), **values, "updated_at": timezone.now()}, params
+        )
+
+        params.append(job_id)
+        query = f'UPDATE "{Job._meta.db_table}" SET {", ".join(assignments)} WHERE "id" = ${len(params)}'
+
+        if expected_statuses is not None:
+            params.append([status.value for status in expected_statuses])
+            query += f' AND "status" = ANY(${len(params)})'
+
+        return await self._execute_update(query, params, returning, count_off_parent)
+
+    async def start(self, job_id: int, returning: Sequence[str] = (), **values) -> Optional[Dict[str, Any]]:
+        """Mark a job processing, unless it already finished (then returns None)."""
+        return await self.update(
+            job_id,
+            {"status": JobStatus.PROCESSING, "started_at": datetime.utcnow(), **values},
+            expected_statuses=ACTIVE_STATUSES,
+            returning=returning
+        )
+
+    def start_buffered(self, job_id: int, **values):
+        """
+        Mark a job processing through the write buffer.
+
+        Nothing is returned, so unlike start this can't tell that the job already
+        finished. Must be called on the worker event loop.
+        """
+        self.write_buffer.add(job_id, {"status": JobStatus.PROCESSING, "started_at": datetime.utcnow(), **values})
+
+    async def _write_buffered(self, pending: Dict[int, Dict[str, Any]]):
+        """
+        Write the buffered values of many jobs in one UPDATE ... FROM unnest(...).
+
+        A column a job has no buffered value for keeps its current value.
+        """
+        fields_map = Job._meta.fields_map
+        names = sorted({name for values in pending.values() for name in values})
+
+        # One array parameter per column, so the statement only depends on the columns
+        params = [list(pending)]
+        arrays = ["$1::int[]"]
+        assignments = []
+        for name in names:
+            params.append([
+                fields_map[name].to_db_value(values[name], Job) if name in values else None
+                for values in pending.values()
+            ])
+            arrays.append(f"${len(params)}::{fields_map[name].get_for_dialect('postgres', 'SQL_TYPE')}[]")
+            column = self._columns([name])
+            assignments.append(f'{column} = COALESCE("buffered"."{name}", "jobs".{column})')
+
+        # A job that finished while the write sat in the buffer keeps its state
+        params += [timezone.now(), [status.value for status in ACTIVE_STATUSES]]
+        buffered_columns = ", ".join(f'"{name}"' for name in ["id", *names])
+        await connections.get("default").execute_query(
+            f'UPDATE "{Job._meta.db_table}" AS "jobs" SET {", ".join(assignments)}, "updated_at" = ${len(params) - 1} '
+            f'FROM unnest({", ".join(arrays)}) AS "buffered"({buffered_columns}) '
+            f'WHERE "jobs"."id" = "buffered"."id" AND "jobs"."status" = ANY(${len(params)})',
+            params
+        )
+
+    async def complete(
+        self,
+        job_id: int,
+        media: List[Dict],
+        returning: Sequence[str] = (),
+        count_off_parent: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Mark a job completed with its media, unless it already finished (then returns None)."""
+        return await self.update(
+            job_id,
+            {"status": JobStatus.COMPLETED, "media": media, "completed_at": datetime.utcnow()},
+            expected_statuses=ACTIVE_STATUSES,
+            returning=returning,
+            count_off_parent=count_off_parent
+        )
+
+    async def fail(self, job_id: int, error_message: str, completed: bool = False) -> bool:
+        """Mark a job failed, unless it already finished. Returns whether it was updated."""
+        values = {"status": JobStatus.FAILED, "error_message": error_message}
+        if completed:
+            values["completed_at"] = datetime.utcnow()
+        return await self.update(job_id, values, expected_statuses=ACTIVE_STATUSES) is not None
+
+    async def record_error(
+        self,
+        job_id: int,
+        error_message: str,
+        max_retry_count: int,
+        completed_on_failure: bool = False,
+        count_off_parent: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Count a failed attempt on a job in a single UPDATE.
+
+        Increments retry_count and sets the status to retry, or to failed once
+        retry_count reaches max_retry_count, all in the database, so the error paths
+        don't have to read the job first. With count_off_parent, a job this fails is
+        counted off its parent (see _execute_update).
+
+        Returns:
+            {"status": ..., "retry_count": ...} after the update, or None if the job
+            already finished
+        """
+        params = [error_message, max_retry_count, JobStatus.FAILED.value, JobStatus.RETRY.value, timezone.now()]
+        gives_up = '"retry_count" + 1 >= $2'
+        assignments = [
+            '"retry_count" = "retry_count" + 1',
+            f'"status" = CASE WHEN {gives_up} THEN $3 ELSE $4 END',
+            '"error_message" = $1',
+            '"updated_at" = $5',
+        ]
+        buffered = self.write_buffer.pop(job_id)
+        buffered.pop("status", None)
+        assignments += self._assignments(buffered, params)
+        if completed_on_failure:
+            params.append(datetime.utcnow())
+            assignments.append(f'"completed_at" = CASE WHEN {gives_up} THEN ${len(params)} ELSE "completed_at" END')
+
+        params += [job_id, [status.value for status in ACTIVE_STATUSES]]
+        query = (
+            f'UPDATE "{Job._meta.db_table}" SET {", ".join(assignments)} '
+            f'WHERE "id" = ${len(params) - 1} AND "status" = ANY(${len(params)})'
+        )
+        return await self._execute_update(query, params, ("status", "retry_count"), count_off_parent)
+
+
+    async def arm_pending_children(self, job_id: int, pending_children: int) -> bool:
+        """
+        Set a fused workflow job's fan-in counter, once.
+
+        A retried dispatch must not reset a counter its earlier uploads may already have
+        counted down. Returns whether it was set, i.e. False if it already was or the job
+        finished.
+        """
+        row = await self._execute(
+            f'UPDATE "{Job._meta.db_table}" SET "pending_children" = $1, "updated_at" = $2 '
+            f'WHERE "id" = $3 AND "pending_children" IS NULL AND "status" = ANY($4) RETURNING "id"',
+            [pending_children, timezone.now(), job_id, [status.value for status in ACTIVE_STATUSES]],
+            ()
+        )
+        return row is not None
+
+
+job_repository = JobRepository()
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import JOB_STATUS_CACHE
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "job_status"
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class JobStatusCache:
+    """
+    Two-tier cache of serialized status responses for completed jobs.
+
+    A completed job is never written to again, so its response only goes stale
+    through its presigned URLs. Entries live for job_status_cache_ttl seconds, capped
+    to half of presigned_url_cache_min_remaining so every URL served from the cache
+    still has a good part of its validity left. The first tier is a bounded
+    in-process LRU. The optional second tier is Redis, shared by the API replicas.
+
+    Entries are (body, etag) pairs, so a cached poll costs neither a query nor a
+    serialization, and a revalidating poll can be answered with a 304.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, bytes, str]]" = OrderedDict()
+
+    def _cache_key(self, job_id: int) -> str:
+        return f"{KEY_PREFIX}:{job_id}"
+
+    def _ttl(self) -> int:
+        return max(min(settings.job_status_cache_ttl, settings.presigned_url_cache_min_remaining // 2), 0)
+
+    def _get_local(self, job_id: int) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(job_id)
+        if entry is None:
+            return None
+
+        expires_at, body, etag = entry
+        if expires_at <= time.monotonic():
+            del self._entries[job_id]
+            return None
+
+        self._entries.move_to_end(job_id)
+        return body, etag
+
+    def _set_local(self, job_id: int, body: bytes, ttl: float) -> Tuple[bytes, str]:
+        etag = make_etag(body)
+        self._entries[job_id] = (time.monotonic() + ttl, body, etag)
+        self._entries.move_to_end(job_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return body, etag
+
+    async def get_many(self, job_ids: List[int]) -> Dict[int, Tuple[bytes, str]]:
+        """Cached (body, etag) by job id for the given jobs that are cached."""
+        if not settings.job_status_cache_enabled or self._ttl() <= 0:
+            return {}
+
+        found = {}
+        missing = []
+        for job_id in job_ids:
+            entry = self._get_local(job_id)
+            if entry is not None:
+                found[job_id] = entry
+            else:
+                missing.append(job_id)
+        JOB_STATUS_CACHE.labels(result="hit").inc(len(found))
+
+        if missing and settings.job_status_cache_redis_enabled:
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    for job_id in missing:
+                        pipe.get(self._cache_key(job_id))
+                        pipe.pttl(self._cache_key(job_id))
+                    results = await pipe.execute()
+
+                redis_hits = 0
+                for job_id, body, remaining_ms in zip(missing, results[::2], results[1::2]):
+                    if body is not None and remaining_ms > 0:
+                        found[job_id] = self._set_local(job_id, body, remaining_ms / 1000)
+                        redis_hits += 1
+                JOB_STATUS_CACHE.labels(result="redis_hit").inc(redis_hits)
+            except Exception as e:
+                logger.warning(f"Job status cache lookup failed for {len(missing)} jobs: {str(e)}")
+
+        JOB_STATUS_CACHE.labels(result="miss").inc(len(job_ids) - len(found))
+        return found
+
+    async def get(self, job_id: int) -> Optional[Tuple[bytes, str]]:
+        return (await self.get_many([job_id])).get(job_id)
+
+    async def set_many(self, bodies: Dict[int, bytes]):
+        """Cache the serialized responses of completed jobs by job id."""
+        ttl = self._ttl()
+        if not settings.job_status_cache_enabled or ttl <= 0 or not bodies:
+            return
+
+        for job_id, body in bodies.items():
+            self._set_local(job_id, body, ttl)
+
+        if settings.job_status_cache_redis_enabled:
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    for job_id, body in bodies.items():
+                        pipe.set(self._cache_key(job_id), body, ex=ttl)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to store {len(bodies)} job status responses in Redis: {str(e)}")
+
+    async def set(self, job_id: int, body: bytes):
+        await self.set_many({job_id: body})
+
+
+job_status_cache = JobStatusCache(max_entries=settings.job_status_cache_max_entries)
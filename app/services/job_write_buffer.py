@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.config import settings
+from app.core.metrics import JOB_WRITE_BUFFER
+
+logger = logging.getLogger(__name__)
+
+
+class JobWriteBuffer:
+    """
+    Coalesces non-critical job writes in a worker process (JOB_WRITE_BUFFER_ENABLED=true).
+
+    Buffered writes are flushed together through one multi-row UPDATE every
+    job_write_buffer_flush_interval seconds, or as soon as job_write_buffer_max_entries
+    jobs are buffered. A synchronous write to a job takes its buffered columns along
+    instead (see pop), so a job written again before the next flush costs one write
+    instead of two.
+
+    Buffered writes are lost if the process dies, so only writes that nothing reads
+    back or waits on belong here. Terminal states are always written synchronously.
+    """
+
+    def __init__(self, flush: Callable[[Dict[int, Dict[str, Any]]], Awaitable[None]]):
+        self._flush = flush
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._full: Optional[asyncio.Event] = None
+
+    def add(self, job_id: int, values: Dict[str, Any]):
+        """Buffer column values for a job, merged over any values already buffered for it."""
+        self._pending[job_id] = {**self._pending.get(job_id, {}), **values}
+
+        if self._flusher is None or self._flusher.done():
+            self._full = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run())
+        if len(self._pending) >= settings.job_write_buffer_max_entries:
+            self._full.set()
+
+    def pop(self, job_id: int) -> Dict[str, Any]:
+        """Take a job's buffered values out of the buffer, to write them with a synchronous write."""
+        values = self._pending.pop(job_id, None)
+        if values is None:
+            return {}
+
+        JOB_WRITE_BUFFER.labels(result="merged").inc()
+        return values
+
+    async def flush(self) -> int:
+        """Write everything buffered. Returns how many jobs were written."""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            await self._flush(pending)
+        except Exception as e:
+            # The jobs may have been written synchronously since, so don't put them back
+            logger.error(f"Failed to flush {len(pending)} buffered job writes, dropping them: {str(e)}")
+            JOB_WRITE_BUFFER.labels(result="dropped").inc(len(pending))
+            return 0
+
+        JOB_WRITE_BUFFER.labels(result="batched").inc(len(pending))
+        return len(pending)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=settings.job_write_buffer_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def close(self):
+        """Stop the flusher and write what is still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+            self._full = None
+        await self.flush()
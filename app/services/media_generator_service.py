@@ -27,4 +27,8 @@ class MediaGeneratorService(ABC):
         Returns:
             List of URLs pointing to the generated media
         """
-        pass
\ No newline at end of file
+        pass
+    
+    async def close(self):
+        """Release any connections held by the service. No-op by default."""
+        pass
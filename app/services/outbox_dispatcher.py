@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from tortoise.transactions import in_transaction
+from app.core.config import settings
+from app.core.metrics import OUTBOX_DISPATCHED, OUTBOX_DISPATCH_DELAY
+from app.models.outbox import OutboxEntry
+from app.tasks.media_generation import start_media_generation_workflows
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Publishes the workflows of jobs created in outbox mode (JOB_DISPATCH_MODE=outbox).
+
+    The API commits each job together with an outbox entry in one transaction, so a
+    job can't be left pending without its workflow, and requests don't wait on the
+    broker. Each API process runs a dispatcher. It claims batches of entries with
+    SELECT ... FOR UPDATE SKIP LOCKED, publishes them over one broker connection and
+    deletes them in the same transaction, so replicas drain the outbox concurrently
+    without publishing the same entries.
+
+    Delivery is at least once: if a process dies after publishing a batch but before
+    committing, the batch is published again later with the same task ids.
+    """
+
+    def __init__(self):
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        if settings.job_dispatch_mode.lower() != "outbox":
+            return
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._run())
+
+    def notify(self):
+        """Dispatch right away after committing new entries instead of at the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def dispatch_batch(self) -> int:
+        """Publish up to outbox_batch_size pending workflows. Returns how many were published."""
+        async with in_transaction():
+            entries = await OutboxEntry.select_for_update(skip_locked=True).order_by("id").limit(
+                settings.outbox_batch_size
+            )
+            if not entries:
+                return 0
+
+            # Publishing is blocking broker I/O, so keep it off the event loop
+            await run_in_threadpool(
+                start_media_generation_workflows,
+                [(entry.job_id, entry.task_id, entry.priority) for entry in entries]
+            )
+            await OutboxEntry.filter(id__in=[entry.id for entry in entries]).delete()
+
+        now = time.time()
+        for entry in entries:
+            OUTBOX_DISPATCH_DELAY.observe(now - entry.created_at.timestamp())
+        OUTBOX_DISPATCHED.inc(len(entries))
+
+        return len(entries)
+
+    async def _run(self):
+        while True:
+            try:
+                dispatched = await self.dispatch_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to dispatch outbox entries: {str(e)}")
+                dispatched = 0
+
+            # A full batch means there is a backlog, so keep draining
+            if dispatched < settings.outbox_batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.outbox_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+            self._wakeup = None
+
+
+outbox_dispatcher = OutboxDispatcher()
@@ -0,0 +1,96 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import PRESIGNED_URL_CACHE
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "presigned_url"
+
+
+class PresignedUrlCache:
+    """
+    Two-tier cache of presigned GET URLs keyed by (s3_key, expiration).
+    
+    Entries live for presigned_url_cache_ttl seconds, capped to leave at least
+    presigned_url_cache_min_remaining seconds of validity on every URL handed out.
+    The first tier is a bounded in-process LRU. The optional second tier is Redis,
+    so API replicas share signatures and repeat polls get the same URL.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    def _cache_key(self, s3_key: str, expiration: int) -> str:
+        return f"{KEY_PREFIX}:{expiration}:{s3_key}"
+    
+    def _ttl(self, expiration: int) -> int:
+        return max(min(settings.presigned_url_cache_ttl, expiration - settings.presigned_url_cache_min_remaining), 0)
+    
+    def _get_local(self, cache_key: str) -> Optional[str]:
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        
+        expires_at, url = entry
+        if expires_at <= time.monotonic():
+            del self._entries[cache_key]
+            return None
+        
+        self._entries.move_to_end(cache_key)
+        return url
+    
+    def _set_local(self, cache_key: str, url: str, ttl: float):
+        self._entries[cache_key] = (time.monotonic() + ttl, url)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    async def get(self, s3_key: str, expiration: int) -> Optional[str]:
+        if not settings.presigned_url_cache_enabled or self._ttl(expiration) <= 0:
+            return None
+        
+        cache_key = self._cache_key(s3_key, expiration)
+        url = self._get_local(cache_key)
+        if url is not None:
+            PRESIGNED_URL_CACHE.labels(result="hit").inc()
+            return url
+        
+        if settings.presigned_url_cache_redis_enabled:
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    pipe.get(cache_key)
+                    pipe.pttl(cache_key)
+                    url, remaining_ms = await pipe.execute()
+                
+                if url is not None and remaining_ms > 0:
+                    url = url.decode()
+                    self._set_local(cache_key, url, remaining_ms / 1000)
+                    PRESIGNED_URL_CACHE.labels(result="redis_hit").inc()
+                    return url
+            except Exception as e:
+                logger.warning(f"Presigned URL cache lookup failed for {s3_key}: {str(e)}")
+        
+        PRESIGNED_URL_CACHE.labels(result="miss").inc()
+        return None
+    
+    async def set(self, s3_key: str, expiration: int, url: str):
+        ttl = self._ttl(expiration)
+        if not settings.presigned_url_cache_enabled or ttl <= 0:
+            return
+        
+        cache_key = self._cache_key(s3_key, expiration)
+        self._set_local(cache_key, url, ttl)
+        
+        if settings.presigned_url_cache_redis_enabled:
+            try:
+                await get_redis().set(cache_key, url, ex=ttl)
+            except Exception as e:
+                logger.warning(f"Failed to store presigned URL for {s3_key} in Redis: {str(e)}")
+
+
+presigned_url_cache = PresignedUrlCache(max_entries=settings.presigned_url_cache_max_entries)
@@ -1,20 +1,143 @@
-import replicate
+import asyncio
+import httpx
 import logging
+import time
 from typing import Any, Dict, List, Optional
 from app.core.config import settings
+from app.core.redis import get_redis
 from app.services.media_generator_service import MediaGeneratorService
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_PREDICTION_STATUSES = {"succeeded", "failed", "canceled"}
+PREDICTION_CHANNEL_PREFIX = "replicate_predictions"
+
+
+async def publish_prediction_update(prediction_id: str):
+    """
+    Wake up the worker waiting on a prediction after a Replicate webhook arrives.
+
+    Only the prediction id is forwarded. The worker re-fetches the prediction from the
+    API, so an unauthenticated webhook call can at most trigger an early poll.
+    """
+    await get_redis().publish(f"{PREDICTION_CHANNEL_PREFIX}:{prediction_id}", "1")
+
 
 class ReplicateService(MediaGeneratorService):
+    """
+    Async-native client for the Replicate predictions API.
+
+    Creates a prediction and polls it with exponential backoff instead of blocking on
+    replicate.Client.run(), so the event loop stays free while a prediction runs and
+    one process can keep many predictions in flight (the generation worker runs the
+    threads pool for this, see worker_lifecycle). A per-model semaphore caps the
+    number of concurrent predictions each process sends to each model.
+
+    When replicate_webhook_url is set, predictions are created with a completion
+    webhook and the wait between polls is cut short as soon as it arrives.
+    """
+
     def __init__(self):
-        self.client = replicate.Client(api_token=settings.replicate_api_token)
-    
+        self.base_url = settings.replicate_api_base_url.rstrip("/")
+        # httpx pools and asyncio semaphores are bound to the loop they're used on,
+        # so both are created lazily per event loop.
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+
+        if self._http_client is None or self._http_client_loop is not loop:
+            self._close_stale_http_client()
+            self._http_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {settings.replicate_api_token}"},
+                timeout=httpx.Timeout(settings.http_read_timeout, connect=settings.http_connect_timeout)
+            )
+            self._http_client_loop = loop
+            self._model_semaphores = {}
+
+        return self._http_client
+
+    def _close_stale_http_client(self):
+        """Close the client of a previous event loop on that loop, unless it's already closed."""
+        if self._http_client is not None and not self._http_client_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._http_client.aclose(), self._http_client_loop)
+
+    def _get_model_semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._model_semaphores:
+            self._model_semaphores[model] = asyncio.Semaphore(settings.replicate_max_concurrent_predictions)
+        return self._model_semaphores[model]
+
+    async def close(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._http_client_loop = None
+            self._model_semaphores = {}
+
+    async def _create_prediction(self, client: httpx.AsyncClient, model: str, input_params: Dict[str, Any]) -> Dict:
+        body: Dict[str, Any] = {"input": input_params}
+
+        if settings.replicate_webhook_url:
+            body["webhook"] = settings.replicate_webhook_url
+            body["webhook_events_filter"] = ["completed"]
+
+        if ":" in model:
+            # owner/name:version runs a specific version, owner/name runs the model's latest
+            _, body["version"] = model.split(":", 1)
+            response = await client.post("/v1/predictions", json=body)
+        else:
+            response = await client.post(f"/v1/models/{model}/predictions", json=body)
+
+        response.raise_for_status()
+        return response.json()
+
+    async def _wait_for_prediction(self, client: httpx.AsyncClient, prediction: Dict) -> Dict:
+        """Poll a prediction with exponential backoff until it reaches a terminal status."""
+        if prediction["status"] in TERMINAL_PREDICTION_STATUSES:
+            return prediction
+
+        interval = settings.replicate_poll_initial_interval
+        deadline = time.monotonic() + settings.replicate_prediction_timeout
+        pubsub = None
+
+        try:
+            if settings.replicate_webhook_url:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(f"{PREDICTION_CHANNEL_PREFIX}:{prediction['id']}")
+
+            while prediction["status"] not in TERMINAL_PREDICTION_STATUSES:
+                if time.monotonic() >= deadline:
+                    try:
+                        await client.post(f"/v1/predictions/{prediction['id']}/cancel")
+                    except httpx.HTTPError as e:
+                        logger.warning(f"Failed to cancel timed out prediction {prediction['id']}: {str(e)}")
+                    raise Exception(
+                        f"Prediction {prediction['id']} timed out after {settings.replicate_prediction_timeout}s"
+                    )
+
+                if pubsub is not None:
+                    # Returns early when the webhook for this prediction arrives
+                    await pubsub.get_message(ignore_subscribe_messages=True, timeout=interval)
+                else:
+                    await asyncio.sleep(interval)
+                interval = min(interval * 2, settings.replicate_poll_max_interval)
+
+                response = await client.get(f"/v1/predictions/{prediction['id']}")
+                response.raise_for_status()
+                prediction = response.json()
+        finally:
+            if pubsub is not None:
+                await pubsub.aclose()
+
+        return prediction
+
     async def generate_media(
-        self, 
-        model: str, 
-        prompt: str, 
+        self,
+        model: str,
+        prompt: str,
         num_outputs: int = 1,
         seed: Optional[int] = None,
         output_format: Optional[str] = None
@@ -24,26 +147,35 @@ class ReplicateService(MediaGeneratorService):
                 "prompt": prompt,
                 "num_outputs": num_outputs
             }
-            
+
             if seed is not None:
                 input_params["seed"] = seed
-            
+
             if output_format is not None:
                 input_params["output_format"] = output_format
-            
+
             logger.info(f"Generating media with model {model} and params: {input_params}")
-            
-            output = self.client.run(model, input=input_params)
-            
+
+            client = self._get_http_client()
+            async with self._get_model_semaphore(model):
+                prediction = await self._create_prediction(client, model, input_params)
+                logger.debug(f"Created prediction {prediction['id']} for model {model}")
+                prediction = await self._wait_for_prediction(client, prediction)
+
+            if prediction["status"] != "succeeded":
+                raise Exception(
+                    f"Prediction {prediction['id']} {prediction['status']}: {prediction.get('error')}"
+                )
+
+            output = prediction.get("output")
             if isinstance(output, list):
                 urls = [str(item) for item in output]
             else:
                 urls = [str(output)]
-            
+
             logger.info(f"Successfully generated {len(urls)} media files")
             return urls
-            
+
         except Exception as e:
             logger.error(f"Error generating media with Replicate: {str(e)}")
             raise e
-
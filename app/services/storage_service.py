@@ -1,12 +1,29 @@
+import asyncio
 import boto3
+import contextvars
+import functools
+import hashlib
 import httpx
+import itertools
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
 from uuid import uuid4
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.core.metrics import MEDIA_DEDUPE, MEDIA_DOWNLOAD_BYTES, MEDIA_DOWNLOADS, S3_REQUEST_DURATION
+from app.core.tracing import get_tracer
+from app.models.media_object import MediaObject
+from app.services.presigned_url_cache import presigned_url_cache
+from app.services.synthetic_media import SYNTHETIC_SCHEME, stream_synthetic_media, synthetic_media_enabled, synthetic_media_type
 
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
 
 
 class StorageService:
@@ -16,9 +33,21 @@ class StorageService:
             endpoint_url=settings.s3_endpoint_url,
             aws_access_key_id=settings.s3_access_key_id,
             aws_secret_access_key=settings.s3_secret_access_key,
-            region_name=settings.s3_region_name
+            region_name=settings.s3_region_name,
+            config=Config(max_pool_connections=settings.s3_max_concurrency)
         )
         self.bucket_name = settings.s3_bucket_name
+        # boto3 is blocking, so every S3 call made from a coroutine runs on this
+        # bounded pool. It is sized to match the botocore connection pool.
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.s3_max_concurrency,
+            thread_name_prefix="s3"
+        )
+        # Shared, pooled HTTP client for media downloads. httpx pools are bound to the
+        # event loop they were created on, so the client is created lazily per loop.
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
         self._ensure_bucket_exists()
     
     def _ensure_bucket_exists(self):
@@ -37,52 +66,345 @@ class StorageService:
                 logger.error(f"Error checking bucket: {e}")
                 raise e
     
+    async def _run_s3(self, method_name: str, **kwargs) -> Any:
+        """Run a blocking S3 client call on the S3 executor without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        # Copy the context so the botocore span joins the caller's trace
+        context = contextvars.copy_context()
+        with S3_REQUEST_DURATION.labels(operation=method_name).time():
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(context.run, getattr(self.s3_client, method_name), **kwargs)
+            )
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        
+        if self._http_client is None or self._http_client_loop is not loop:
+            self._close_stale_http_client()
+            self._http_client = httpx.AsyncClient(
+                http2=settings.http2_enabled,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry
+                ),
+                timeout=httpx.Timeout(
+                    settings.http_read_timeout,
+                    connect=settings.http_connect_timeout
+                ),
+                follow_redirects=True
+            )
+            self._http_client_loop = loop
+            self._host_semaphores = {}
+        
+        return self._http_client
+    
+    def _close_stale_http_client(self):
+        """Close the client of a previous event loop on that loop, unless it's already closed."""
+        if self._http_client is not None and not self._http_client_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._http_client.aclose(), self._http_client_loop)
+    
+    def _get_host_semaphore(self, media_url: str) -> asyncio.Semaphore:
+        """
+        httpx only limits connections globally, so cap concurrent downloads per host here.
+        
+        A download holds its slot while its origin connection is open. The body streams
+        straight into S3, so that includes the parts uploaded while it's being read, but
+        the slot is freed as soon as the body has been read (see upload_from_url).
+        """
+        host = urlsplit(media_url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(settings.http_max_connections_per_host)
+        return self._host_semaphores[host]
+    
+    async def close(self):
+        """Close the shared HTTP client. Called on app and worker shutdown."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._http_client_loop = None
+            self._host_semaphores = {}
+    
     async def upload_from_url(self, media_url: str, job_id: int) -> str:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(media_url)
-                response.raise_for_status()
+            file_extension = self._get_file_extension_from_url(media_url)
+            
+            if urlsplit(media_url).scheme == SYNTHETIC_SCHEME:
+                if not synthetic_media_enabled():
+                    raise ValueError(
+                        f"Synthetic media URLs are only accepted with MEDIA_GENERATOR_PROVIDER=fake "
+                        f"and FAKE_MEDIA_SOURCE=synthetic: {media_url}"
+                    )
                 
-                file_extension = self._get_file_extension_from_url(media_url)
-                s3_key = f"jobs/{job_id}/{uuid4()}{file_extension}"
+                # Load testing: the bytes are produced here instead of downloaded
+                with tracer.start_as_current_span("upload_from_url", attributes={"job.id": job_id, "media.url": media_url}):
+                    s3_key = await self._upload_stream(
+                        self._count_download_bytes(stream_synthetic_media(media_url, settings.download_chunk_size)),
+                        job_id,
+                        file_extension,
+                        synthetic_media_type(urlsplit(media_url).path)
+                    )
+                logger.info(f"Successfully uploaded synthetic media with key: {s3_key}")
+                return s3_key
+            
+            client = self._get_http_client()
+            opened_connection = False
+            
+            async def _trace(event_name: str, info: dict):
+                nonlocal opened_connection
+                if event_name == "connection.connect_tcp.complete":
+                    opened_connection = True
+            
+            with tracer.start_as_current_span("upload_from_url", attributes={"job.id": job_id, "media.url": media_url}):
+                async with AsyncExitStack() as origin:
+                    await origin.enter_async_context(self._get_host_semaphore(media_url))
+                    response = await origin.enter_async_context(
+                        client.stream("GET", media_url, extensions={"trace": _trace})
+                    )
+                    MEDIA_DOWNLOADS.labels(connection="new" if opened_connection else "reused").inc()
+                    response.raise_for_status()
+                    
+                    async def _download() -> AsyncIterator[bytes]:
+                        async for chunk in response.aiter_bytes(settings.download_chunk_size):
+                            yield chunk
+                        # The body has been read: release the connection and the host's slot
+                        # before the last parts are uploaded and the upload completes
+                        await origin.aclose()
+                    
+                    s3_key = await self._upload_stream(
+                        self._count_download_bytes(_download()),
+                        job_id,
+                        file_extension,
+                        response.headers.get('content-type', 'application/octet-stream')
+                    )
+            
+            logger.info(f"Successfully uploaded media with key: {s3_key}")
+            return s3_key
                 
-                self.s3_client.put_object(
+        except Exception as e:
+            logger.error(f"Error uploading media from URL {media_url}: {str(e)}")
+            raise e
+    
+    async def _count_download_bytes(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            MEDIA_DOWNLOAD_BYTES.inc(len(chunk))
+            yield chunk
+    
+    async def _upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        job_id: int,
+        file_extension: str,
+        content_type: str
+    ) -> str:
+        """
+        Pipe a byte stream into S3 while holding at most a few parts in memory.
+        
+        Streams smaller than one part are written with a single put_object. Anything
+        larger switches to a multipart upload with up to s3_multipart_concurrency
+        parts in flight, so peak memory is roughly (concurrency + 1) * part_size
+        regardless of the object size.
+        
+        With deduplication enabled the content is hashed while streaming. Objects
+        whose hash is already in the media_objects index are not written again and
+        the existing key is returned instead.
+        
+        Returns:
+            The S3 key holding the content
+        """
+        # S3 rejects non-final parts smaller than 5 MiB
+        part_size = max(settings.s3_multipart_part_size, MIN_MULTIPART_PART_SIZE)
+        concurrency = max(settings.s3_multipart_concurrency, 1)
+        dedupe = settings.media_dedupe_enabled
+        
+        hasher = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        upload_key = None
+        upload_id = None
+        parts = []
+        part_numbers = itertools.count(1)
+        in_flight = set()
+        
+        async def _upload_part(part_number: int, body: bytes):
+            response = await self._run_s3(
+                "upload_part",
+                Bucket=self.bucket_name,
+                Key=upload_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body
+            )
+            parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+        
+        async def _submit_part(body: bytes):
+            # Wait for a free slot before buffering another part in flight
+            while len(in_flight) >= concurrency:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight.difference_update(done)
+                for task in done:
+                    task.result()
+            
+            in_flight.add(asyncio.create_task(_upload_part(next(part_numbers), body)))
+        
+        async def _abort_multipart_upload():
+            try:
+                await self._run_s3(
+                    "abort_multipart_upload",
+                    Bucket=self.bucket_name,
+                    Key=upload_key,
+                    UploadId=upload_id
+                )
+            except ClientError as abort_error:
+                logger.error(f"Failed to abort multipart upload {upload_id}: {abort_error}")
+        
+        try:
+            async for chunk in chunks:
+                hasher.update(chunk)
+                size += len(chunk)
+                buffer.extend(chunk)
+                
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        # The hash isn't known until the stream ends, so large objects
+                        # are uploaded under a unique key and indexed by hash afterwards
+                        upload_key = f"{self._get_key_prefix(job_id)}/{uuid4()}{file_extension}"
+                        response = await self._run_s3(
+                            "create_multipart_upload",
+                            Bucket=self.bucket_name,
+                            Key=upload_key,
+                            ContentType=content_type
+                        )
+                        upload_id = response["UploadId"]
+                        logger.debug(f"Started multipart upload {upload_id} for key: {upload_key}")
+                    
+                    body = bytes(buffer[:part_size])
+                    del buffer[:part_size]
+                    await _submit_part(body)
+            
+            digest = hasher.hexdigest()
+            
+            if upload_id is None:
+                if dedupe:
+                    existing = await MediaObject.get_or_none(sha256=digest)
+                    if existing:
+                        MEDIA_DEDUPE.labels(result="hit").inc()
+                        logger.info(f"Content {digest} already stored, reusing key: {existing.s3_key}")
+                        return existing.s3_key
+                    s3_key = f"media/{digest}{file_extension}"
+                else:
+                    s3_key = f"{self._get_key_prefix(job_id)}/{uuid4()}{file_extension}"
+                
+                await self._run_s3(
+                    "put_object",
                     Bucket=self.bucket_name,
                     Key=s3_key,
-                    Body=response.content,
-                    ContentType=response.headers.get('content-type', 'application/octet-stream')
+                    Body=bytes(buffer),
+                    ContentType=content_type
                 )
                 
-                logger.info(f"Successfully uploaded media with key: {s3_key}")
+                if dedupe:
+                    MEDIA_DEDUPE.labels(result="miss").inc()
+                    return await self._register_media_object(digest, s3_key, size, content_type)
                 return s3_key
-                
-        except Exception as e:
-            logger.error(f"Error uploading media from URL {media_url}: {str(e)}")
-            raise e
+            
+            if buffer:
+                await _submit_part(bytes(buffer))
+                buffer.clear()
+            
+            if in_flight:
+                await asyncio.gather(*in_flight)
+                in_flight.clear()
+            
+            if dedupe:
+                existing = await MediaObject.get_or_none(sha256=digest)
+                if existing:
+                    # Nothing is visible in S3 until completion, so aborting discards the copy
+                    await _abort_multipart_upload()
+                    MEDIA_DEDUPE.labels(result="hit").inc()
+                    logger.info(f"Content {digest} already stored, reusing key: {existing.s3_key}")
+                    return existing.s3_key
+            
+            await self._run_s3(
+                "complete_multipart_upload",
+                Bucket=self.bucket_name,
+                Key=upload_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])}
+            )
+            logger.debug(f"Completed multipart upload {upload_id} with {len(parts)} parts for key: {upload_key}")
+            
+            if dedupe:
+                MEDIA_DEDUPE.labels(result="miss").inc()
+                return await self._register_media_object(digest, upload_key, size, content_type)
+            return upload_key
+            
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            
+            if upload_id is not None:
+                await _abort_multipart_upload()
+            raise
+    
+    async def _register_media_object(self, digest: str, s3_key: str, size: int, content_type: str) -> str:
+        """
+        Add stored content to the dedupe index.
+        
+        If a concurrent upload of the same content registered first, its key wins
+        and the object just written under a different key is removed.
+        """
+        media_object, created = await MediaObject.get_or_create(
+            sha256=digest,
+            defaults={
+                "s3_key": s3_key,
+                "size": size,
+                "content_type": content_type
+            }
+        )
+        
+        if not created and media_object.s3_key != s3_key:
+            try:
+                await self._run_s3("delete_object", Bucket=self.bucket_name, Key=s3_key)
+            except ClientError as e:
+                logger.error(f"Failed to delete duplicate object {s3_key}: {e}")
+        
+        return media_object.s3_key
+    
+    def _get_key_prefix(self, job_id: int) -> str:
+        return "media/uploads" if settings.media_dedupe_enabled else f"jobs/{job_id}"
     
     def _get_file_extension_from_url(self, url: str) -> str:
-        if url.lower().endswith('.jpg') or url.lower().endswith('.jpeg'):
+        path = urlsplit(url).path.lower()
+        if path.endswith('.jpg') or path.endswith('.jpeg'):
             return '.jpg'
-        elif url.lower().endswith('.png'):
+        elif path.endswith('.png'):
             return '.png'
-        elif url.lower().endswith('.gif'):
+        elif path.endswith('.gif'):
             return '.gif'
-        elif url.lower().endswith('.mp4'):
+        elif path.endswith('.mp4'):
             return '.mp4'
-        elif url.lower().endswith('.wav'):
+        elif path.endswith('.wav'):
             return '.wav'
-        elif url.lower().endswith('.mp3'):
+        elif path.endswith('.mp3'):
             return '.mp3'
         else:
             return '.bin'
     
-    def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> str:
+    async def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> str:
         try:
-            response = self.s3_client.generate_presigned_url(
-                'get_object',
+            cached_url = await presigned_url_cache.get(s3_key, expiration)
+            if cached_url is not None:
+                return cached_url
+            
+            response = await self._run_s3(
+                "generate_presigned_url",
+                ClientMethod='get_object',
                 Params={'Bucket': self.bucket_name, 'Key': s3_key},
                 ExpiresIn=expiration
             )
+            await presigned_url_cache.set(s3_key, expiration, response)
             return response
         except ClientError as e:
             logger.error(f"Error generating presigned URL: {e}")
@@ -0,0 +1,87 @@
+import asyncio
+import os
+from typing import AsyncIterator, Iterator, Optional
+from urllib.parse import urlsplit
+from app.core.config import settings
+
+# URLs the fake media generator returns with FAKE_MEDIA_SOURCE=synthetic. Their bytes are
+# produced by the downloading process itself, e.g. synthetic://local/media/1048576.jpg?...
+SYNTHETIC_SCHEME = "synthetic"
+
+MEDIA_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "video/mp4": "mp4",
+    "audio/wav": "wav",
+    "audio/mpeg": "mp3",
+    "application/octet-stream": "bin",
+}
+
+BLOCK_SIZE = 1024 * 1024
+_BLOCK = os.urandom(BLOCK_SIZE)
+
+
+def synthetic_media_enabled() -> bool:
+    """
+    Whether synthetic:// URLs are honoured, i.e. the fake provider generates them.
+
+    Anywhere else a provider output could make a worker produce and upload an
+    object of any size, so they're rejected.
+    """
+    return (
+        settings.media_generator_provider.lower() == "fake"
+        and settings.fake_media_source.lower() == "synthetic"
+    )
+
+
+def synthetic_media_path(size: int, media_type: str) -> str:
+    """Path of a synthetic object of size bytes, e.g. /media/1048576.jpg"""
+    return f"/media/{size}.{MEDIA_TYPE_EXTENSIONS.get(media_type, 'bin')}"
+
+
+def parse_synthetic_media_path(path: str) -> Optional[int]:
+    """Size of the synthetic object at path, or None if it isn't a synthetic media path."""
+    name = path.rsplit("/", 1)[-1].split("?", 1)[0]
+    try:
+        return int(name.split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def synthetic_media_type(path: str) -> str:
+    extension = path.split("?", 1)[0].rsplit(".", 1)[-1].lower()
+    for media_type, media_extension in MEDIA_TYPE_EXTENSIONS.items():
+        if media_extension == extension:
+            return media_type
+    return "application/octet-stream"
+
+
+def iter_synthetic_media(path: str, size: int, chunk_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Pseudo-random bytes of a synthetic object, without holding it in memory.
+
+    The body starts with the path (query included), so objects that only differ in
+    their query string have distinct content and aren't all deduplicated into one.
+    """
+    chunk_size = min(chunk_size, BLOCK_SIZE)
+    remaining = size
+    chunk = (path.encode() + _BLOCK)[:min(remaining, chunk_size)]
+    while remaining > 0:
+        yield chunk
+        remaining -= len(chunk)
+        chunk = _BLOCK[:min(remaining, chunk_size)]
+
+
+async def stream_synthetic_media(media_url: str, chunk_size: int) -> AsyncIterator[bytes]:
+    """Stream the bytes of a synthetic:// media URL in-process."""
+    parts = urlsplit(media_url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    size = parse_synthetic_media_path(parts.path)
+    if size is None:
+        raise ValueError(f"Not a synthetic media URL: {media_url}")
+
+    for chunk in iter_synthetic_media(path, size, chunk_size):
+        yield chunk
+        # Hand the loop back between chunks, as a network download would
+        await asyncio.sleep(0)
@@ -1,6 +1,20 @@
 from celery import Celery
 from app.core.config import settings
 
+GENERATION_QUEUE = "generation"
+UPLOADS_QUEUE = "uploads"
+BOOKKEEPING_QUEUE = "bookkeeping"
+
+# Job priorities run from 0 to MAX_JOB_PRIORITY, higher is more urgent. The Redis
+# transport consumes lower priority numbers first, so the value is inverted.
+MAX_JOB_PRIORITY = 9
+
+
+def broker_priority(job_priority: int) -> int:
+    """Map a job priority to the Redis broker message priority."""
+    return MAX_JOB_PRIORITY - job_priority
+
+
 celery_app = Celery(
     "mediageneration",
     broker=settings.celery_broker_url,
@@ -17,4 +31,25 @@ celery_app.conf.update(
     task_track_started=True,
     task_reject_on_worker_lost=True,
     worker_prefetch_multiplier=1,
-)
\ No newline at end of file
+    # Slow provider calls and fast uploads get their own queues so neither starves
+    # the other and each worker pool can be sized for its own bottleneck.
+    # Orchestration, chord callbacks and anything unrouted go to bookkeeping.
+    task_default_queue=BOOKKEEPING_QUEUE,
+    task_routes={
+        "app.tasks.media_generation.generate_media_task": {"queue": GENERATION_QUEUE},
+        "app.tasks.media_generation.generate_and_dispatch_media_task": {"queue": GENERATION_QUEUE},
+        "app.tasks.media_generation.persist_media_to_s3": {"queue": UPLOADS_QUEUE},
+        "app.tasks.media_generation.orchestrate_media_workflow": {"queue": BOOKKEEPING_QUEUE},
+        "app.tasks.media_generation.trigger_media_persistence_chord": {"queue": BOOKKEEPING_QUEUE},
+        "app.tasks.media_generation.finalize_media_generation": {"queue": BOOKKEEPING_QUEUE},
+    },
+    # One Redis list per priority level, so higher priority jobs are always consumed first.
+    # Within a level kombu keeps its default round_robin queue order, so a worker consuming
+    # several queues doesn't drain one before the others.
+    broker_transport_options={
+        "priority_steps": list(range(MAX_JOB_PRIORITY + 1)),
+    },
+    task_default_priority=broker_priority(settings.job_default_priority),
+    # Follow-up tasks (chain steps, uploads, chord callbacks, retries) keep the job's priority
+    task_inherit_parent_priority=True,
+)
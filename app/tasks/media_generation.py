@@ -1,18 +1,25 @@
-import asyncio
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict
+import math
+from typing import Optional, List, Dict, Tuple
+from uuid import uuid4
 from celery import Task, chord, group, chain
 from celery.exceptions import Retry
-from tortoise import Tortoise
-from app.tasks.celery_app import celery_app
+from tortoise.transactions import in_transaction
+from app.tasks.celery_app import celery_app, broker_priority
+from app.tasks.worker_lifecycle import in_task_thread, run_async
+from app.tasks import task_metrics  # noqa: F401 (registers the task metrics signal handlers)
 from app.models.job import Job, JobStatus
 from app.services.media_generator_factory import get_media_generator_service
 from app.services.storage_service import storage_service
+from app.services.generation_cache import generation_cache
+from app.services.job_events import publish_job_event
+from app.services.job_repository import ACTIVE_STATUSES, job_repository
 from app.core.config import settings
-from app.core.database import TORTOISE_ORM
+from app.core.metrics import GENERATE_MEDIA_DURATION
+from app.core.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 
 
 class CallbackTask(Task):
@@ -23,34 +30,95 @@ class CallbackTask(Task):
         logger.error(f"Task {task_id} failed: {exc}")
 
 
+# Job fields the generation and the generation cache key are built from
+GENERATION_FIELDS = ("model", "prompt", "seed", "num_outputs", "output_format")
+
+
+def retry_backoff(retry_count: int) -> int:
+    return min(settings.initial_retry_delay * (2 ** retry_count), settings.max_retry_delay)
+
+
+def max_retry_count() -> int:
+    """The retry count at which the backoff reaches max_retry_delay and the job fails."""
+    return max(1, math.ceil(math.log2(settings.max_retry_delay / settings.initial_retry_delay)))
+
+
+async def record_job_error(
+    task: Task,
+    job_id: int,
+    error_message: str,
+    completed_on_failure: bool = False,
+    count_off_parent: bool = False
+) -> Optional[Dict]:
+    """
+    Count a failed attempt on a job and retry the task with exponential backoff.
+    
+    Returns the updated job once the backoff reaches max_retry_delay and the job is marked
+    failed (with parent_pending_children if count_off_parent), and None if the job had
+    already finished. Otherwise raises the task's Retry.
+    """
+    job = await job_repository.record_error(
+        job_id, error_message, max_retry_count(), completed_on_failure, count_off_parent
+    )
+    if job is None:
+        logger.warning(f"Job {job_id} already finished, not retrying")
+        return None
+    
+    if job["status"] == JobStatus.FAILED:
+        return job
+    
+    raise await in_task_thread(task.retry, countdown=retry_backoff(job["retry_count"]), max_retries=10)
+
+
 @celery_app.task(bind=True, base=CallbackTask)
-def persist_media_to_s3(self, media_url: str, job_id: int, child_job_id: int) -> Dict:
-    """Upload a single media file to S3."""
+def persist_media_to_s3(self, media_url: str, job_id: int, child_job_id: int, fused: bool = False) -> Dict:
+    """
+    Upload a single media file to S3.
+    
+    In the fused workflow the upload that finishes a child also counts it off the parent's
+    pending_children, in the same statement, and the upload that brings it to zero
+    finalizes the parent.
+    """
+    task_id = self.request.id
+    
     async def _upload_media():
-        await Tortoise.init(config=TORTOISE_ORM)
         try:
-            # Update child job status to processing and set celery_task_id
-            child_job = await Job.get(id=child_job_id)
-            await child_job.update_from_dict({
-                "celery_task_id": self.request.id,
-                "status": JobStatus.PROCESSING,
-                "started_at": datetime.utcnow()
-            })
-            await child_job.save()
+            # Mark the child processing, unless a redelivered upload already finished it.
+            # A buffered start can't tell, then complete() below skips a finished child.
+            if settings.job_write_buffer_enabled:
+                job_repository.start_buffered(child_job_id, celery_task_id=task_id)
+            elif await job_repository.start(child_job_id, celery_task_id=task_id) is None:
+                child_job = await Job.get(id=child_job_id)
+                if fused:
+                    await resume_fused_finalization(job_id)
+                if child_job.status != JobStatus.COMPLETED:
+                    raise Exception(f"Child job {child_job_id} already failed: {child_job.error_message}")
+                logger.info(f"Child job {child_job_id} already completed, skipping upload")
+                return {
+                    "media_url": media_url,
+                    "s3_key": child_job.media[0]["s3_key"],
+                    "child_job_id": child_job_id
+                }
             
             s3_key = await storage_service.upload_from_url(media_url, job_id)
             logger.info(f"Successfully uploaded media {media_url} to S3 with key: {s3_key}")
             
-            # Update child job with completion status and results
-            await child_job.update_from_dict({
-                "status": JobStatus.COMPLETED,
-                "media": [{
-                    "media_url": media_url,
-                    "s3_key": s3_key
-                }],
-                "completed_at": datetime.utcnow()
-            })
-            await child_job.save()
+            # Only the upload that completes the child publishes it and counts it off the parent
+            completed = await job_repository.complete(child_job_id, [{
+                "media_url": media_url,
+                "s3_key": s3_key
+            }], count_off_parent=fused)
+            if completed is not None:
+                await publish_job_event(
+                    job_id, "media", JobStatus.COMPLETED,
+                    child_job_id=child_job_id, media_url=media_url, s3_key=s3_key
+                )
+                
+                if fused:
+                    await finalize_after_child(job_id, completed["parent_pending_children"])
+            elif fused:
+                # The child had already finished, which a buffered start can't tell up front
+                await resume_fused_finalization(job_id)
             
             return {
                 "media_url": media_url,
@@ -61,48 +129,29 @@ def persist_media_to_s3(self, media_url: str, job_id: int, child_job_id: int) ->
             logger.error(f"Error in media upload for child job {child_job_id}: {str(e)}")
             
             try:
-                child_job = await Job.get(id=child_job_id)
-                current_retry = child_job.retry_count + 1
-                
-                backoff_delay = min(
-                    settings.initial_retry_delay * (2 ** current_retry),
-                    settings.max_retry_delay
+                failed = await record_job_error(
+                    self, child_job_id, str(e), completed_on_failure=True, count_off_parent=fused
                 )
-                
-                if backoff_delay >= settings.max_retry_delay:
-                    await child_job.update_from_dict({
-                        "status": JobStatus.FAILED,
-                        "error_message": str(e),
-                        "retry_count": current_retry,
-                        "completed_at": datetime.utcnow()
-                    })
-                    await child_job.save()
-                    raise e
-                else:
-                    await child_job.update_from_dict({
-                        "status": JobStatus.RETRY,
-                        "error_message": str(e),
-                        "retry_count": current_retry
-                    })
-                    await child_job.save()
-                    
-                    raise self.retry(countdown=backoff_delay, max_retries=10)
+                if failed:
+                    await publish_job_event(
+                        job_id, "media", JobStatus.FAILED,
+                        child_job_id=child_job_id, media_url=media_url, error_message=str(e)
+                    )
+                    if fused:
+                        await finalize_after_child(job_id, failed["parent_pending_children"])
+                raise e
                     
             except Exception as update_error:
                 logger.error(f"Failed to update child job {child_job_id} status: {str(update_error)}")
                 raise e
-        finally:
-            await Tortoise.close_connections()
     
-    return asyncio.run(_upload_media())
+    return run_async(_upload_media())
 
 
 @celery_app.task(bind=True, base=CallbackTask)
 def trigger_media_persistence_chord(self, media_urls: List[str], job_id: int, child_job_ids: List[int]):
     """Trigger parallel media uploads using a dynamic chord."""
     async def _trigger_chord():
-        await Tortoise.init(config=TORTOISE_ORM)
-        
         try:
             logger.info(f"Triggering chord for {len(media_urls)} media files for job {job_id}")
             
@@ -111,111 +160,240 @@ def trigger_media_persistence_chord(self, media_urls: List[str], job_id: int, ch
                            for media_url, child_job_id in zip(media_urls, child_job_ids)]
             
             # Create chord with callback
-            job_result = chord(upload_tasks)(finalize_media_generation.s(job_id))
+            job_result = await in_task_thread(chord(upload_tasks), finalize_media_generation.s(job_id))
             return {"chord_id": job_result.id, "job_id": job_id}
             
         except Exception as e:
             logger.error(f"Error triggering chord for job {job_id}: {str(e)}")
             
             try:
-                job = await Job.get(id=job_id)
-                current_retry = job.retry_count + 1
-                
-                backoff_delay = min(
-                    settings.initial_retry_delay * (2 ** current_retry),
-                    settings.max_retry_delay
-                )
-                
-                if backoff_delay >= settings.max_retry_delay:
-                    await job.update_from_dict({
-                        "status": JobStatus.FAILED,
-                        "error_message": str(e),
-                        "retry_count": current_retry
-                    })
-                    await job.save()
-                    raise e
-                else:
-                    await job.update_from_dict({
-                        "status": JobStatus.RETRY,
-                        "error_message": str(e),
-                        "retry_count": current_retry
-                    })
-                    await job.save()
-                    
-                    raise self.retry(countdown=backoff_delay, max_retries=10)
+                if await record_job_error(self, job_id, str(e)):
+                    await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=str(e))
+                raise e
                     
             except Exception as update_error:
                 logger.error(f"Failed to update job status: {str(update_error)}")
                 raise e
                 
-        finally:
-            await Tortoise.close_connections()
     
-    return asyncio.run(_trigger_chord())
+    return run_async(_trigger_chord())
 
 
 @celery_app.task(bind=True, base=CallbackTask)
 def finalize_media_generation(self, media_results: List[Dict], job_id: int) -> Dict:
     """Finalize job after all media files have been uploaded."""
     async def _finalize():
-        await Tortoise.init(config=TORTOISE_ORM)
         try:
-            job = await Job.get(id=job_id)
-            await job.update_from_dict({
-                "status": JobStatus.COMPLETED,
-                "media": media_results,
-                "completed_at": datetime.utcnow()
-            })
-            await job.save()
-            
-            logger.info(f"Successfully completed media generation for job {job_id} with {len(media_results)} media files")
+            await complete_job(job_id, media_results)
             return {"status": "success", "media": media_results}
         except Exception as e:
             logger.error(f"Error finalizing job {job_id}: {str(e)}")
             
             try:
-                job = await Job.get(id=job_id)
-                current_retry = job.retry_count + 1
-                
-                backoff_delay = min(
-                    settings.initial_retry_delay * (2 ** current_retry),
-                    settings.max_retry_delay
-                )
-                
-                if backoff_delay >= settings.max_retry_delay:
-                    await job.update_from_dict({
-                        "status": JobStatus.FAILED,
-                        "error_message": f"Failed to finalize: {str(e)}",
-                        "retry_count": current_retry
-                    })
-                    await job.save()
-                    raise e
-                else:
-                    await job.update_from_dict({
-                        "status": JobStatus.RETRY,
-                        "error_message": f"Failed to finalize: {str(e)}",
-                        "retry_count": current_retry
-                    })
-                    await job.save()
-                    
-                    raise self.retry(countdown=backoff_delay, max_retries=10)
+                error_message = f"Failed to finalize: {str(e)}"
+                if await record_job_error(self, job_id, error_message):
+                    await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=error_message)
+                raise e
                     
             except Exception as update_error:
                 logger.error(f"Failed to update job status during finalization: {str(update_error)}")
                 raise e
-        finally:
-            await Tortoise.close_connections()
     
-    return asyncio.run(_finalize())
+    return run_async(_finalize())
+
+
+async def complete_job(job_id: int, media_results: List[Dict]):
+    """Mark a parent job completed with its persisted media and add it to the generation cache."""
+    job = await job_repository.complete(job_id, media_results, returning=GENERATION_FIELDS)
+    if job is None:
+        logger.info(f"Job {job_id} already finished")
+        return
+    await publish_job_event(job_id, "job", JobStatus.COMPLETED, media=media_results)
+    
+    cache_key = generation_cache.make_key(
+        job["model"], job["prompt"], job["seed"], job["num_outputs"], job["output_format"]
+    )
+    await generation_cache.set(cache_key, [
+        {"media_url": result["media_url"], "s3_key": result["s3_key"]}
+        for result in media_results
+    ])
+    
+    logger.info(f"Successfully completed media generation for job {job_id} with {len(media_results)} media files")
 
 
-def start_media_generation_workflow(job_id: int):
-    """Start the media generation workflow with dynamic chord for parallel uploads."""
+async def finalize_fused_job(job_id: int):
+    """Finalize a fused workflow job from its child jobs once all of them have finished."""
+    job = await Job.get(id=job_id)
+    # job.media holds the generated urls in provider order, see generate_and_dispatch_media_task.
+    # Only their children count, not any other child rows of the parent.
+    media_urls = {item["media_url"] for item in job.media}
+    children = {
+        child.media[0].get("media_url"): child
+        for child in await Job.filter(parent_id=job_id).all()
+        if child.media and len(child.media) > 0 and child.media[0].get("media_url") in media_urls
+    }
+    
+    failed = [
+        media_url for media_url in media_urls
+        if media_url not in children or children[media_url].status != JobStatus.COMPLETED
+    ]
+    if failed:
+        error_message = f"Failed to persist {len(failed)} of {len(media_urls)} media files"
+        if await job_repository.fail(job_id, error_message, completed=True):
+            await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=error_message)
+        return
+    
+    media_results = [
+        {
+            "media_url": item["media_url"],
+            "s3_key": children[item["media_url"]].media[0]["s3_key"],
+            "child_job_id": children[item["media_url"]].id
+        }
+        for item in job.media
+    ]
+    await complete_job(job_id, media_results)
+
+
+async def finalize_after_child(job_id: int, pending_children: Optional[int]):
+    """
+    Fused workflow fan-in: finalize the parent once its last child has been counted off.
+    
+    Args:
+        job_id: The parent job
+        pending_children: The parent's children still pending after counting a finished
+            child off, or None if nothing was left to count off
+    """
+    if pending_children is None:
+        logger.warning(f"All children of job {job_id} were already counted")
+        return
+    if pending_children > 0:
+        return
+    
+    try:
+        await finalize_fused_job(job_id)
+    except Exception as e:
+        logger.error(f"Error finalizing job {job_id}: {str(e)}")
+        
+        try:
+            error_message = f"Failed to finalize: {str(e)}"
+            if await job_repository.fail(job_id, error_message, completed=True):
+                await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=error_message)
+        except Exception as update_error:
+            logger.error(f"Failed to update job status during finalization: {str(update_error)}")
+
+
+async def resume_fused_finalization(job_id: int):
+    """
+    Finalize a fused workflow job whose children were all counted off, but which is still active.
+    
+    The upload that counted off the last child may have died before finalizing the parent.
+    Its redelivery finds the child already finished and finalizes the parent through here.
+    """
+    job = await Job.get(id=job_id)
+    if job.pending_children == 0 and job.status in ACTIVE_STATUSES:
+        await finalize_after_child(job_id, 0)
+
+
+def start_media_generation_workflow(
+    job_id: int,
+    task_id: Optional[str] = None,
+    mode: Optional[str] = None,
+    priority: Optional[int] = None,
+    **options
+):
+    """
+    Start the media generation workflow.
+    
+    In "chord" mode generation, orchestration, the upload chord and finalization each
+    run as separate tasks. In "fused" mode a single task generates the media, creates
+    the child jobs and dispatches the uploads, and the parent is finalized by the last
+    upload through a counter on the parent row, saving the extra broker round trips and
+    the chord unlock polling.
+    
+    Args:
+        job_id: The job to process
+        task_id: Optional pre-generated id for the workflow result (the last task in the
+            chain in chord mode, the generation task in fused mode)
+        mode: "chord" or "fused", defaults to settings.workflow_mode
+        priority: Job priority (0-9, higher first), defaults to settings.job_default_priority.
+            Every later task of the workflow inherits it.
+        **options: Extra apply_async options, e.g. a shared broker connection
+    """
+    if priority is not None:
+        options["priority"] = broker_priority(priority)
+    
+    if (mode or settings.workflow_mode).lower() == "fused":
+        return generate_and_dispatch_media_task.apply_async((job_id,), task_id=task_id, **options)
+    
     workflow = chain(
         generate_media_task.s(job_id),
         orchestrate_media_workflow.s()
     )
-    return workflow.delay()
+    return workflow.apply_async(task_id=task_id, **options)
+
+
+def start_media_generation_workflows(jobs: List[Tuple[int, str, int]]):
+    """
+    Start the workflows for many jobs over a single broker connection.
+    
+    Args:
+        jobs: (job_id, task_id, priority) tuples. The task ids must already be stored on the jobs.
+    """
+    with celery_app.connection_for_write() as connection:
+        for job_id, task_id, priority in jobs:
+            start_media_generation_workflow(job_id, task_id=task_id, priority=priority, connection=connection)
+
+
+async def create_child_jobs(job_id: int, media_urls: List[str]) -> List[int]:
+    """
+    Create the child (upload) jobs for a parent job, reusing any that already exist.
+    
+    Runs in a constant number of round trips regardless of num_outputs: one fetch of
+    the existing children and, if any are missing, one bulk insert plus a re-fetch.
+    The unique index on (parent_id, media_url) makes concurrent or retried calls
+    idempotent.
+    
+    Returns:
+        Child job ids in the same order as media_urls
+    """
+    def _children_by_media_url(children: List[Job]) -> Dict[str, Job]:
+        return {
+            child.media[0].get("media_url"): child
+            for child in children
+            if child.media and len(child.media) > 0
+        }
+    
+    async with in_transaction():
+        existing_children = _children_by_media_url(await Job.filter(parent_id=job_id).all())
+        
+        missing_media_urls = [
+            media_url for media_url in dict.fromkeys(media_urls)
+            if media_url not in existing_children
+        ]
+        
+        if missing_media_urls:
+            await Job.bulk_create([
+                Job(
+                    celery_task_id=f"{job_id}_upload_{uuid4()}_pending",
+                    parent_id=job_id,
+                    model="",
+                    prompt="",
+                    num_outputs=0,
+                    media=[{"media_url": media_url}],
+                    status=JobStatus.PENDING
+                )
+                for media_url in missing_media_urls
+            ], ignore_conflicts=True)
+            
+            existing_children = _children_by_media_url(await Job.filter(parent_id=job_id).all())
+        else:
+            logger.info(f"All child jobs already exist for job {job_id}, reusing them")
+    
+    missing = [media_url for media_url in media_urls if media_url not in existing_children]
+    if missing:
+        raise Exception(f"Failed to create child jobs for media urls: {missing}")
+    
+    return [existing_children[media_url].id for media_url in media_urls]
 
 
 @celery_app.task(bind=True, base=CallbackTask)
@@ -226,72 +404,21 @@ def orchestrate_media_workflow(self, result: Dict) -> Dict:
         job_id = result["job_id"]
         
         async def _create_child_jobs():
-            await Tortoise.init(config=TORTOISE_ORM)
             try:
-                child_job_ids = []
-                for i, media_url in enumerate(media_urls):
-                    # Check if child job already exists for this media_url
-                    existing_children = await Job.filter(parent_id=job_id).all()
-                    existing_child = None
-                    
-                    for child in existing_children:
-                        if child.media and len(child.media) > 0:
-                            if child.media[0].get("media_url") == media_url:
-                                existing_child = child
-                                break
-                    
-                    if existing_child:
-                        logger.info(f"Child job already exists for media_url {media_url}, reusing job {existing_child.id}")
-                        child_job_ids.append(existing_child.id)
-                    else:
-                        child_job = await Job.create(
-                            celery_task_id=f"{job_id}_upload_{i}_pending",
-                            parent_id=job_id,
-                            model="",
-                            prompt="",
-                            num_outputs=0,
-                            media=[{"media_url": media_url}],
-                            status=JobStatus.PENDING
-                        )
-                        child_job_ids.append(child_job.id)
-                return child_job_ids
+                return await create_child_jobs(job_id, media_urls)
             except Exception as e:
                 logger.error(f"Error creating child jobs for job {job_id}: {str(e)}")
                 
                 try:
-                    job = await Job.get(id=job_id)
-                    current_retry = job.retry_count + 1
-                    
-                    backoff_delay = min(
-                        settings.initial_retry_delay * (2 ** current_retry),
-                        settings.max_retry_delay
-                    )
-                    
-                    if backoff_delay >= settings.max_retry_delay:
-                        await job.update_from_dict({
-                            "status": JobStatus.FAILED,
-                            "error_message": str(e),
-                            "retry_count": current_retry
-                        })
-                        await job.save()
-                        raise e
-                    else:
-                        await job.update_from_dict({
-                            "status": JobStatus.RETRY,
-                            "error_message": str(e),
-                            "retry_count": current_retry
-                        })
-                        await job.save()
-                        
-                        raise self.retry(countdown=backoff_delay, max_retries=10)
+                    if await record_job_error(self, job_id, str(e)):
+                        await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=str(e))
+                    raise e
                         
                 except Exception as update_error:
                     logger.error(f"Failed to update job status: {str(update_error)}")
                     raise e
-            finally:
-                await Tortoise.close_connections()
         
-        child_job_ids = asyncio.run(_create_child_jobs())
+        child_job_ids = run_async(_create_child_jobs())
         
         # Trigger the chord for parallel uploads with child job IDs
         return trigger_media_persistence_chord.delay(media_urls, job_id, child_job_ids)
@@ -300,74 +427,138 @@ def orchestrate_media_workflow(self, result: Dict) -> Dict:
         return result
 
 
+async def generate_job_media(job_id: int, reuse_generated: bool = False) -> Dict:
+    """
+    Generate the media for a job, or complete it straight from the generation cache.
+    
+    With reuse_generated, media urls an earlier attempt already saved on the job (see
+    generate_and_dispatch_media_task) are returned instead of generating new ones.
+    
+    Returns:
+        {"status": "media_generated", "media_urls": [...]}, {"status": "cached", "media": [...]},
+        or {"status": "skipped"} if the job already finished
+    """
+    returning = (*GENERATION_FIELDS, "media") if reuse_generated else GENERATION_FIELDS
+    job = await job_repository.start(job_id, returning=returning)
+    if job is None:
+        logger.info(f"Job {job_id} already finished, skipping generation")
+        return {"status": "skipped", "job_id": job_id}
+    await publish_job_event(job_id, "job", JobStatus.PROCESSING)
+    
+    if reuse_generated and job["media"]:
+        logger.info(f"Reusing the media generated for job {job_id} by an earlier attempt")
+        return {"status": "media_generated", "media_urls": [item["media_url"] for item in job["media"]], "job_id": job_id}
+    
+    cache_key = generation_cache.make_key(
+        job["model"], job["prompt"], job["seed"], job["num_outputs"], job["output_format"]
+    )
+    cached_media = await generation_cache.get(cache_key)
+    
+    if cached_media is not None:
+        # Seeded generations are deterministic, so reuse the already persisted outputs
+        await job_repository.complete(job_id, cached_media)
+        await publish_job_event(job_id, "job", JobStatus.COMPLETED, media=cached_media)
+        
+        logger.info(f"Completed job {job_id} from generation cache with {len(cached_media)} media files")
+        return {"status": "cached", "media": cached_media, "job_id": job_id}
+    
+    logger.info(f"Starting media generation for job {job_id}")
+    
+    media_generator = get_media_generator_service()
+    span_attributes = {"job.id": job_id, "job.model": job["model"], "job.num_outputs": job["num_outputs"]}
+    with GENERATE_MEDIA_DURATION.labels(model=job["model"]).time(), \
+            tracer.start_as_current_span("generate_media", attributes=span_attributes):
+        media_urls = await media_generator.generate_media(
+            model=job["model"],
+            prompt=job["prompt"],
+            num_outputs=job["num_outputs"],
+            seed=job["seed"],
+            output_format=job["output_format"]
+        )
+    
+    if not media_urls:
+        raise Exception("No media URLs returned from media generator")
+    
+    logger.info(f"Media generation completed for job {job_id}. Triggering parallel uploads.")
+    
+    # Return media URLs for the calling task to persist
+    return {"status": "media_generated", "media_urls": media_urls, "job_id": job_id}
+
+
 @celery_app.task(bind=True, base=CallbackTask)
 def generate_media_task(self, job_id: int) -> dict:
     async def _generate_media():
-        await Tortoise.init(config=TORTOISE_ORM)
-        
         try:
-            job = await Job.get(id=job_id)
-            await job.update_from_dict({
-                "status": JobStatus.PROCESSING,
-                "started_at": datetime.utcnow()
-            })
-            await job.save()
+            return await generate_job_media(job_id)
             
-            logger.info(f"Starting media generation for job {job_id}")
+        except Exception as e:
+            logger.error(f"Error in media generation for job {job_id}: {str(e)}")
             
-            media_generator = get_media_generator_service()
-            media_urls = await media_generator.generate_media(
-                model=job.model,
-                prompt=job.prompt,
-                num_outputs=job.num_outputs,
-                seed=job.seed,
-                output_format=job.output_format
-            )
+            try:
+                if await record_job_error(self, job_id, str(e)):
+                    await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=str(e))
+                raise e
+                    
+            except Exception as update_error:
+                logger.error(f"Failed to update job status: {str(update_error)}")
+                raise e
+                
+    
+    return run_async(_generate_media())
+
+
+@celery_app.task(bind=True, base=CallbackTask)
+def generate_and_dispatch_media_task(self, job_id: int) -> Dict:
+    """Fused workflow: generate media, create the child jobs and dispatch the uploads in one task."""
+    async def _generate_and_dispatch():
+        try:
+            result = await generate_job_media(job_id, reuse_generated=True)
+            if result["status"] != "media_generated":
+                return result
             
-            if not media_urls:
-                raise Exception("No media URLs returned from media generator")
+            # Keep the generated urls on the parent before creating its children, so a retry
+            # reuses them (and their children) instead of generating new ones. Finalization
+            # also returns the media in this provider order.
+            media_urls = result["media_urls"]
+            if await job_repository.update(
+                job_id,
+                {"media": [{"media_url": media_url} for media_url in media_urls]},
+                expected_statuses=ACTIVE_STATUSES
+            ) is None:
+                logger.info(f"Job {job_id} already finished, not dispatching uploads")
+                return {"status": "skipped", "job_id": job_id}
             
-            # Trigger parallel media persistence using chord
-            logger.info(f"Media generation completed for job {job_id}. Triggering parallel uploads.")
+            child_job_ids = await create_child_jobs(job_id, media_urls)
             
-            # Return media URLs to trigger the chord in a separate task
-            return {"status": "media_generated", "media_urls": media_urls, "job_id": job_id}
+            # Duplicate media urls share a child job, so upload each child once
+            uploads = dict(zip(child_job_ids, media_urls))
+            
+            # Arm the fan-in counter before any upload can finish. A retry finds it armed
+            # and only dispatches the children still unfinished again.
+            if not await job_repository.arm_pending_children(job_id, len(uploads)):
+                unfinished = set(await Job.filter(
+                    id__in=list(uploads), status__in=ACTIVE_STATUSES
+                ).values_list("id", flat=True))
+                uploads = {child_job_id: media_url for child_job_id, media_url in uploads.items() if child_job_id in unfinished}
+            
+            await in_task_thread(group(
+                persist_media_to_s3.s(media_url, job_id, child_job_id, fused=True)
+                for child_job_id, media_url in uploads.items()
+            ).apply_async)
+            
+            logger.info(f"Dispatched {len(uploads)} uploads for job {job_id}")
+            return {"status": "uploads_dispatched", "job_id": job_id, "child_job_ids": list(uploads)}
             
         except Exception as e:
-            logger.error(f"Error in media generation for job {job_id}: {str(e)}")
+            logger.error(f"Error in fused media workflow for job {job_id}: {str(e)}")
             
             try:
-                job = await Job.get(id=job_id)
-                current_retry = job.retry_count + 1
-                
-                backoff_delay = min(
-                    settings.initial_retry_delay * (2 ** current_retry),
-                    settings.max_retry_delay
-                )
-                
-                if backoff_delay >= settings.max_retry_delay:
-                    await job.update_from_dict({
-                        "status": JobStatus.FAILED,
-                        "error_message": str(e),
-                        "retry_count": current_retry
-                    })
-                    await job.save()
-                    raise e
-                else:
-                    await job.update_from_dict({
-                        "status": JobStatus.RETRY,
-                        "error_message": str(e),
-                        "retry_count": current_retry
-                    })
-                    await job.save()
-                    
-                    raise self.retry(countdown=backoff_delay, max_retries=10)
+                if await record_job_error(self, job_id, str(e)):
+                    await publish_job_event(job_id, "job", JobStatus.FAILED, error_message=str(e))
+                raise e
                     
             except Exception as update_error:
                 logger.error(f"Failed to update job status: {str(update_error)}")
                 raise e
-                
-        finally:
-            await Tortoise.close_connections()
     
-    return asyncio.run(_generate_media())
\ No newline at end of file
+    return run_async(_generate_and_dispatch())
@@ -0,0 +1,57 @@
+import logging
+import os
+import time
+from datetime import datetime
+from celery.signals import before_task_publish, task_prerun, worker_init, worker_process_shutdown
+from prometheus_client import multiprocess, start_http_server
+from app.core.config import settings
+from app.core.metrics import TASK_QUEUE_TIME, TASK_RETRIES, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+SENT_AT_HEADER = "sent_at"
+
+
+@before_task_publish.connect
+def stamp_task_publish(headers=None, **kwargs):
+    """Stamp every published task with its send time, and count retries as they're scheduled."""
+    if headers is None:
+        return
+
+    headers[SENT_AT_HEADER] = time.time()
+    if headers.get("retries"):
+        TASK_RETRIES.labels(task=headers.get("task")).inc()
+
+
+@task_prerun.connect
+def observe_queue_time(task=None, **kwargs):
+    sent_at = getattr(task.request, SENT_AT_HEADER, None)
+    if sent_at is None:
+        return
+
+    # Countdown/ETA tasks (retries with backoff) only become runnable at their ETA
+    eta = task.request.eta
+    if eta:
+        sent_at = max(sent_at, datetime.fromisoformat(eta).timestamp())
+
+    TASK_QUEUE_TIME.labels(task=task.name).observe(max(time.time() - sent_at, 0.0))
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Expose the worker's metrics, aggregated across its pool processes, over HTTP."""
+    if not settings.worker_metrics_port:
+        return
+
+    try:
+        start_http_server(settings.worker_metrics_port, registry=metrics_registry())
+        logger.info(f"Worker metrics exporter listening on port {settings.worker_metrics_port}")
+    except OSError as e:
+        # e.g. several workers on one host: metrics are optional, the worker isn't
+        logger.warning(f"Failed to start worker metrics exporter on port {settings.worker_metrics_port}: {str(e)}")
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
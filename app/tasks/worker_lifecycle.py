@@ -0,0 +1,202 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+from celery import bootsteps
+from celery.concurrency import get_implementation
+from celery.concurrency.thread import TaskPool as ThreadTaskPool
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+from app.core.database import init_db, close_db
+from app.core.config import settings
+from app.core.redis import close_redis
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.services.job_repository import job_repository
+from app.services.media_generator_factory import get_media_generator_service
+from app.services.storage_service import storage_service
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# One long-lived event loop per worker process. Tortoise's asyncpg pool is bound
+# to the loop it was created on, so every task body must run on this loop.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Set when the worker runs the threads pool (-P threads). The loop then runs forever on
+# this thread and every pool thread submits its task coroutine to it, so one process
+# keeps --concurrency tasks in flight on shared database, HTTP and S3 clients instead
+# of running a process per task.
+_loop_thread: Optional[threading.Thread] = None
+
+# Calls to run on the pool thread of the task that owns the current coroutine, see in_task_thread
+_task_thread_calls: contextvars.ContextVar[Optional[queue.SimpleQueue]] = contextvars.ContextVar(
+    "task_thread_calls", default=None
+)
+
+# How often the consumer event loop wakes up with the threads pool, see ThreadPoolHubWakeup
+THREAD_POOL_HUB_WAKEUP_INTERVAL = 0.05
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    """Create the process event loop and open the database pool on it."""
+    global _loop
+
+    setup_tracing(f"{settings.tracing_service_name}-worker")
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(init_db())
+    _loop = loop
+
+    logger.info("Worker event loop started and database pool initialized")
+    return loop
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the persistent event loop for this worker process.
+
+    The loop is normally created by the worker_process_init signal. It is created
+    lazily here as well so that pools which don't fork (e.g. --pool=solo) still work.
+    """
+    if _loop is None or _loop.is_closed():
+        return _start_loop()
+    return _loop
+
+
+def _start_loop_thread():
+    """Start the process event loop on its own thread, shared by all pool threads."""
+    global _loop_thread
+
+    loop = get_worker_loop()
+
+    def _run_loop():
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    _loop_thread = threading.Thread(target=_run_loop, name="worker-event-loop", daemon=True)
+    _loop_thread.start()
+    logger.info("Worker event loop thread started, tasks share it across pool threads")
+
+
+async def _run_with_task_thread(calls: queue.SimpleQueue, coro: Coroutine[Any, Any, T]) -> T:
+    _task_thread_calls.set(calls)
+    return await coro
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a task coroutine to completion on the worker process event loop.
+
+    With the threads pool the coroutine runs on the shared loop thread while the
+    calling pool thread waits for it, running any in_task_thread calls meanwhile.
+    """
+    if _loop_thread is None:
+        return get_worker_loop().run_until_complete(coro)
+
+    calls = queue.SimpleQueue()
+    future = asyncio.run_coroutine_threadsafe(_run_with_task_thread(calls, coro), _loop)
+    future.add_done_callback(lambda _: calls.put(None))
+    for call in iter(calls.get, None):
+        call()
+    return future.result()
+
+
+async def in_task_thread(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking call that needs the current Celery task's context.
+
+    Celery keeps the executing task (self.request, current_task) per thread, so calls
+    like task.retry() or apply_async() with an inherited priority must not run on the
+    shared loop thread of the threads pool. They run on the task's pool thread instead.
+    Otherwise the call is made in place.
+    """
+    calls = _task_thread_calls.get()
+    if calls is None:
+        return func(*args, **kwargs)
+
+    future = concurrent.futures.Future()
+
+    def _call():
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    calls.put(_call)
+    return await asyncio.wrap_future(future)
+
+
+async def _close_resources():
+    await get_media_generator_service().close()
+    await storage_service.close()
+    await close_redis()
+    await job_repository.write_buffer.close()
+    await close_db()
+
+
+class ThreadPoolHubWakeup(bootsteps.StartStopStep):
+    """
+    Keep the consumer's event loop responsive with the threads pool.
+
+    Pool threads hand their acks to the consumer's event loop, which only runs them
+    when it next wakes up, and with the prefetch limit reached it waits up to a second
+    for broker events that can't come. The uploads would then run in waves of
+    --concurrency tasks. A no-op timer wakes the loop every few milliseconds instead.
+    """
+    requires = ("celery.worker.consumer.tasks:Tasks",)
+    _timer = None
+
+    def start(self, c):
+        if c.hub is not None and isinstance(c.pool, ThreadTaskPool):
+            self._timer = c.hub.call_repeatedly(THREAD_POOL_HUB_WAKEUP_INTERVAL, lambda: None)
+
+    def stop(self, c):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+celery_app.steps["consumer"].add(ThreadPoolHubWakeup)
+
+
+@worker_init.connect
+def init_worker(sender=None, **kwargs):
+    # Prefork workers open their loop in each pool process instead, after the fork
+    if sender is not None and issubclass(get_implementation(sender.pool_cls), ThreadTaskPool):
+        _start_loop_thread()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    get_worker_loop()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    global _loop, _loop_thread
+
+    if _loop is None or _loop.is_closed():
+        return
+
+    try:
+        if _loop_thread is not None:
+            asyncio.run_coroutine_threadsafe(_close_resources(), _loop).result()
+        else:
+            _loop.run_until_complete(_close_resources())
+        logger.info("Worker HTTP, Redis and database connections closed")
+    except Exception as e:
+        logger.error(f"Error closing worker resources: {str(e)}")
+    finally:
+        if _loop_thread is not None:
+            _loop.call_soon_threadsafe(_loop.stop)
+            _loop_thread.join()
+            _loop_thread = None
+        _loop.close()
+        _loop = None
+        shutdown_tracing()
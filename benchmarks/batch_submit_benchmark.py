@@ -0,0 +1,76 @@
+"""
+Submission throughput of POST /generate:batch vs. individual POST /generate calls.
+
+For each --sizes entry, submits that many jobs once as a single batch request and
+once as individual requests (with --concurrency in flight), against a running API.
+
+Usage:
+    python -m benchmarks.batch_submit_benchmark --base-url http://localhost:8000 --sizes 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+import httpx
+
+
+def _job_request(i: int) -> Dict:
+    return {
+        "model": "benchmark/model",
+        "prompt": f"batch submit benchmark {i}",
+        "num_outputs": 1,
+    }
+
+
+async def submit_batch(client: httpx.AsyncClient, size: int) -> float:
+    start = time.perf_counter()
+    response = await client.post("/api/v1/generate:batch", json={"jobs": [_job_request(i) for i in range(size)]})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def submit_individually(client: httpx.AsyncClient, size: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _submit(i: int):
+        async with semaphore:
+            response = await client.post("/api/v1/generate", json=_job_request(i))
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_submit(i) for i in range(size)))
+    return time.perf_counter() - start
+
+
+async def run(base_url: str, sizes: List[int], concurrency: int) -> Dict:
+    results = []
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=600) as client:
+        for size in sizes:
+            batch = await submit_batch(client, size)
+            individual = await submit_individually(client, size, concurrency)
+            results.append({
+                "jobs": size,
+                "batch_sec": round(batch, 3),
+                "batch_jobs_per_sec": round(size / batch, 2),
+                "individual_sec": round(individual, 3),
+                "individual_jobs_per_sec": round(size / individual, 2),
+            })
+
+    return {"benchmark": "batch_submit", "concurrency": concurrency, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.base_url, args.sizes, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
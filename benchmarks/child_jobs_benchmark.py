@@ -0,0 +1,120 @@
+"""
+Micro-benchmark for child job creation in orchestrate_media_workflow.
+
+Compares the previous per-URL loop (re-fetch all children + one INSERT per URL)
+with create_child_jobs() (one fetch, one bulk insert, one re-fetch) for a parent
+with --num-outputs media URLs, running the orchestration --retries extra times to
+mimic task retries. Reports wall time and database round trips for each.
+
+Usage:
+    python -m benchmarks.child_jobs_benchmark --num-outputs 10 --retries 3
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List
+from app.core.database import init_db, close_db
+from app.models.job import Job, JobStatus
+from app.tasks.media_generation import create_child_jobs
+
+
+class QueryCounter(logging.Handler):
+    """Counts the queries Tortoise logs on its db client logger."""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+async def legacy_create_child_jobs(job_id: int, media_urls: List[str]) -> List[int]:
+    child_job_ids = []
+    for i, media_url in enumerate(media_urls):
+        existing_children = await Job.filter(parent_id=job_id).all()
+        existing_child = None
+
+        for child in existing_children:
+            if child.media and len(child.media) > 0:
+                if child.media[0].get("media_url") == media_url:
+                    existing_child = child
+                    break
+
+        if existing_child:
+            child_job_ids.append(existing_child.id)
+        else:
+            child_job = await Job.create(
+                celery_task_id=f"{job_id}_upload_{i}_{time.time_ns()}_pending",
+                parent_id=job_id,
+                model="",
+                prompt="",
+                num_outputs=0,
+                media=[{"media_url": media_url}],
+                status=JobStatus.PENDING
+            )
+            child_job_ids.append(child_job.id)
+    return child_job_ids
+
+
+async def bench(name: str, create, num_outputs: int, retries: int, counter: QueryCounter) -> Dict:
+    parent = await Job.create(
+        celery_task_id=f"benchmark_{name}_{time.time_ns()}",
+        model="benchmark",
+        prompt="benchmark",
+        num_outputs=num_outputs,
+    )
+    media_urls = [f"https://example.com/{parent.id}/{i}.jpg" for i in range(num_outputs)]
+
+    try:
+        counter.count = 0
+        start = time.perf_counter()
+        for _ in range(retries + 1):
+            await create(parent.id, media_urls)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "round_trips": counter.count,
+        }
+    finally:
+        await Job.filter(parent_id=parent.id).delete()
+        await parent.delete()
+
+
+async def run(num_outputs: int, retries: int) -> Dict:
+    counter = QueryCounter()
+    db_logger = logging.getLogger("tortoise.db_client")
+    db_logger.addHandler(counter)
+    db_logger.setLevel(logging.DEBUG)
+    db_logger.propagate = False
+
+    await init_db()
+    try:
+        legacy = await bench("legacy", legacy_create_child_jobs, num_outputs, retries, counter)
+        bulk = await bench("bulk", create_child_jobs, num_outputs, retries, counter)
+    finally:
+        await close_db()
+
+    return {
+        "benchmark": "child_jobs",
+        "num_outputs": num_outputs,
+        "retries": retries,
+        "legacy": legacy,
+        "bulk": bulk,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-outputs", type=int, default=10)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.num_outputs, args.retries)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
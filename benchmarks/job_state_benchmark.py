@@ -0,0 +1,180 @@
+"""
+Benchmark for job state transitions: full-row saves vs. JobRepository.
+
+Runs the state transitions of --jobs jobs with --num-outputs children each, with
+--retries failed upload attempts per child, once the previous way (Job.get ->
+update_from_dict -> save, which rewrites every column including the prompt and
+media) and once through job_repository (one targeted UPDATE per transition).
+Prompts are --prompt-bytes long. Reports wall time, database round trips and the
+WAL bytes written for each (pg_current_wal_lsn before and after, so run it against
+an otherwise idle Postgres).
+
+Usage:
+    python -m benchmarks.job_state_benchmark --jobs 50 --num-outputs 4 --prompt-bytes 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import secrets
+import time
+from datetime import datetime
+from typing import Dict, List
+from tortoise import connections
+from app.core.database import init_db, close_db
+from app.models.job import Job, JobStatus
+from app.services.job_repository import job_repository
+from app.tasks.media_generation import GENERATION_FIELDS
+from benchmarks.child_jobs_benchmark import QueryCounter
+
+
+async def legacy_transitions(job_id: int, child_ids: List[int], retries: int):
+    job = await Job.get(id=job_id)
+    await job.update_from_dict({"status": JobStatus.PROCESSING, "started_at": datetime.utcnow()})
+    await job.save()
+
+    for child_id in child_ids:
+        child = await Job.get(id=child_id)
+        await child.update_from_dict({"status": JobStatus.PROCESSING, "started_at": datetime.utcnow()})
+        await child.save()
+
+        for _ in range(retries):
+            child = await Job.get(id=child_id)
+            await child.update_from_dict({
+                "status": JobStatus.RETRY,
+                "error_message": "upload failed",
+                "retry_count": child.retry_count + 1
+            })
+            await child.save()
+
+        await child.update_from_dict({
+            "status": JobStatus.COMPLETED,
+            "media": [{"media_url": f"https://example.com/{child_id}.jpg", "s3_key": f"jobs/{child_id}.jpg"}],
+            "completed_at": datetime.utcnow()
+        })
+        await child.save()
+
+    job = await Job.get(id=job_id)
+    await job.update_from_dict({
+        "status": JobStatus.COMPLETED,
+        "media": [{"media_url": f"https://example.com/{child_id}.jpg"} for child_id in child_ids],
+        "completed_at": datetime.utcnow()
+    })
+    await job.save()
+
+
+async def repository_transitions(job_id: int, child_ids: List[int], retries: int):
+    await job_repository.start(job_id, returning=GENERATION_FIELDS)
+
+    for child_id in child_ids:
+        await job_repository.start(child_id)
+
+        for _ in range(retries):
+            await job_repository.record_error(child_id, "upload failed", max_retry_count=retries + 1)
+
+        await job_repository.complete(
+            child_id,
+            [{"media_url": f"https://example.com/{child_id}.jpg", "s3_key": f"jobs/{child_id}.jpg"}]
+        )
+
+    await job_repository.complete(
+        job_id,
+        [{"media_url": f"https://example.com/{child_id}.jpg"} for child_id in child_ids],
+        returning=GENERATION_FIELDS
+    )
+
+
+async def _wal_lsn() -> str:
+    rows = await connections.get("default").execute_query_dict("SELECT pg_current_wal_lsn() AS lsn")
+    return rows[0]["lsn"]
+
+
+async def _wal_bytes_since(lsn: str) -> int:
+    rows = await connections.get("default").execute_query_dict(
+        "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), $1) AS bytes", [lsn]
+    )
+    return int(rows[0]["bytes"])
+
+
+async def bench(name: str, transitions, jobs: int, num_outputs: int, retries: int, prompt_bytes: int, counter: QueryCounter) -> Dict:
+    job_ids = []
+    children = {}
+    for i in range(jobs):
+        job = await Job.create(
+            celery_task_id=f"benchmark_{name}_{i}_{time.time_ns()}",
+            model="benchmark",
+            prompt=secrets.token_urlsafe(prompt_bytes)[:prompt_bytes],
+            num_outputs=num_outputs,
+        )
+        job_ids.append(job.id)
+        children[job.id] = []
+        for j in range(num_outputs):
+            child = await Job.create(
+                celery_task_id=f"benchmark_{name}_{i}_{j}_{time.time_ns()}",
+                parent_id=job.id,
+                model="",
+                prompt="",
+                num_outputs=0,
+                media=[{"media_url": f"https://example.com/{job.id}/{j}.jpg"}],
+            )
+            children[job.id].append(child.id)
+
+    try:
+        lsn = await _wal_lsn()
+        counter.count = 0
+        start = time.perf_counter()
+        for job_id in job_ids:
+            await transitions(job_id, children[job_id], retries)
+        elapsed = time.perf_counter() - start
+        round_trips = counter.count
+        wal_bytes = await _wal_bytes_since(lsn)
+
+        return {
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "round_trips": round_trips,
+            "wal_bytes": wal_bytes,
+            "wal_bytes_per_job": round(wal_bytes / jobs),
+        }
+    finally:
+        await Job.filter(parent_id__in=job_ids).delete()
+        await Job.filter(id__in=job_ids).delete()
+
+
+async def run(jobs: int, num_outputs: int, retries: int, prompt_bytes: int) -> Dict:
+    counter = QueryCounter()
+    db_logger = logging.getLogger("tortoise.db_client")
+    db_logger.addHandler(counter)
+    db_logger.setLevel(logging.DEBUG)
+    db_logger.propagate = False
+
+    await init_db()
+    try:
+        legacy = await bench("legacy", legacy_transitions, jobs, num_outputs, retries, prompt_bytes, counter)
+        repository = await bench("repository", repository_transitions, jobs, num_outputs, retries, prompt_bytes, counter)
+    finally:
+        await close_db()
+
+    return {
+        "benchmark": "job_state",
+        "jobs": jobs,
+        "num_outputs": num_outputs,
+        "retries": retries,
+        "prompt_bytes": prompt_bytes,
+        "legacy": legacy,
+        "repository": repository,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--num-outputs", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--prompt-bytes", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.jobs, args.num_outputs, args.retries, args.prompt_bytes)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
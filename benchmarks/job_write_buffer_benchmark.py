@@ -0,0 +1,144 @@
+"""
+Database commits of the upload job writes with and without the job write buffer.
+
+Replays the job writes of --rate uploads per second for --duration seconds on one
+event loop, as an uploads worker on the threads pool runs them: mark the child
+processing, wait for the upload (--upload-ms on average, exponentially
+distributed), then complete it. Once with synchronous starts, once with
+JOB_WRITE_BUFFER_ENABLED (flushed every JOB_WRITE_BUFFER_FLUSH_INTERVAL seconds).
+
+Reports the write transactions committed per second and per upload, counted by the
+transaction ids Postgres assigned (so run it against an otherwise idle Postgres), and
+where the buffered starts went.
+
+Usage:
+    python -m benchmarks.job_write_buffer_benchmark --rate 500 --duration 10 --upload-ms 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+from prometheus_client import REGISTRY
+from tortoise import connections
+from app.core.config import settings
+from app.core.database import init_db, close_db
+from app.models.job import Job
+from app.services.job_repository import job_repository
+
+
+async def _next_transaction_id() -> int:
+    """Every write transaction gets the next transaction id, this query included."""
+    rows = await connections.get("default").execute_query_dict(
+        "SELECT pg_current_xact_id()::text::bigint AS xid"
+    )
+    return int(rows[0]["xid"])
+
+
+async def _create_jobs(uploads: int) -> List[int]:
+    parent = await Job.create(
+        celery_task_id=f"benchmark_write_buffer_{time.time_ns()}",
+        model="benchmark",
+        prompt="job write buffer benchmark",
+        num_outputs=uploads,
+    )
+    await Job.bulk_create([
+        Job(
+            celery_task_id=f"benchmark_write_buffer_{parent.id}_{i}",
+            parent_id=parent.id,
+            model="",
+            prompt="",
+            num_outputs=0,
+            media=[{"media_url": f"upload-{i}"}],
+        )
+        for i in range(uploads)
+    ])
+    return [parent.id, *await Job.filter(parent_id=parent.id).order_by("id").values_list("id", flat=True)]
+
+
+async def _upload(child_job_id: int, upload_ms: float, buffered: bool):
+    if buffered:
+        job_repository.start_buffered(child_job_id, celery_task_id=f"upload-{child_job_id}")
+    else:
+        await job_repository.start(child_job_id, celery_task_id=f"upload-{child_job_id}")
+
+    await asyncio.sleep(random.expovariate(1000 / upload_ms))
+    await job_repository.complete(child_job_id, [{"media_url": f"upload-{child_job_id}", "s3_key": "benchmark"}])
+
+
+def _buffer_writes() -> Dict[str, float]:
+    return {
+        result: REGISTRY.get_sample_value("job_write_buffer_writes_total", {"result": result}) or 0.0
+        for result in ("batched", "merged", "dropped")
+    }
+
+
+async def bench(buffered: bool, rate: int, duration: float, upload_ms: float) -> Dict:
+    settings.job_write_buffer_enabled = buffered
+    uploads = int(rate * duration)
+    parent_id, *child_job_ids = await _create_jobs(uploads)
+
+    try:
+        transactions = await _next_transaction_id()
+        buffer_writes = _buffer_writes()
+
+        # Open loop: uploads start on schedule however long the writes take
+        start = time.perf_counter()
+        tasks = []
+        for i, child_job_id in enumerate(child_job_ids):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_upload(child_job_id, upload_ms, buffered)))
+        await asyncio.gather(*tasks)
+        await job_repository.write_buffer.flush()
+        elapsed = time.perf_counter() - start
+
+        transactions = await _next_transaction_id() - transactions - 1
+        buffer_writes = {result: int(count - buffer_writes[result]) for result, count in _buffer_writes().items()}
+    finally:
+        await Job.filter(parent_id=parent_id).delete()
+        await Job.filter(id=parent_id).delete()
+
+    return {
+        "uploads_per_sec": round(uploads / elapsed, 2),
+        "commits_per_sec": round(transactions / elapsed, 2),
+        "commits_per_upload": round(transactions / uploads, 3),
+        **({"buffered_starts": buffer_writes} if buffered else {}),
+    }
+
+
+async def run(rate: int, duration: float, upload_ms: float) -> Dict:
+    await init_db()
+    try:
+        direct = await bench(False, rate, duration, upload_ms)
+        buffered = await bench(True, rate, duration, upload_ms)
+    finally:
+        await job_repository.write_buffer.close()
+        await close_db()
+
+    return {
+        "benchmark": "job_write_buffer",
+        "rate": rate,
+        "duration": duration,
+        "upload_ms": upload_ms,
+        "flush_interval": settings.job_write_buffer_flush_interval,
+        "max_entries": settings.job_write_buffer_max_entries,
+        "direct": direct,
+        "buffered": buffered,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=500, help="Uploads started per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--upload-ms", type=float, default=200.0, help="Mean upload time")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.rate, args.duration, args.upload_ms)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+End-to-end load test: submits jobs to the API at a target rate and tracks them to completion.
+
+Runs against the real API and Celery workers, with docker-compose.loadtest.yml swapping
+the media provider for local stand-ins (replicate_standin and media_origin), so the
+whole pipeline runs on Postgres, Redis and MinIO without any external service.
+
+Jobs are submitted on a fixed schedule (open loop), so a slow API doesn't lower the
+offered load. Outstanding jobs are polled through POST /status:batch. Reports:
+
+- throughput (completed jobs per second) and submission outcomes (accepted, 429, errors)
+- submit latency, and submit-to-complete latency from the server timestamps
+- per-stage timings from the job and child job timestamps:
+    queue_wait   created -> generation task started
+    generation   generation task started -> first upload started
+    uploads      first upload started -> last upload completed
+    finalize     last upload completed -> job completed
+
+The result is a JSON document (also written to --output) tagged with the git commit,
+so runs can be compared across commits.
+
+Usage:
+    docker compose -f docker-compose.yml -f docker-compose.loadtest.yml up -d
+    docker compose exec app python -m benchmarks.load_test --rate 20 --duration 60 --output /app/benchmarks/results.json
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import httpx
+from benchmarks.status_latency_benchmark import summarize
+
+TERMINAL_STATUSES = {"completed", "failed"}
+STATUS_BATCH_SIZE = 500
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() if value else None
+
+
+def stage_timings(job: Dict) -> Dict[str, float]:
+    """Split a completed job's latency into stages using its and its child jobs' timestamps."""
+    created_at = _timestamp(job["created_at"])
+    started_at = _timestamp(job["started_at"])
+    completed_at = _timestamp(job["completed_at"])
+    stages = {"submit_to_complete": completed_at - created_at}
+
+    if started_at is not None:
+        stages["queue_wait"] = started_at - created_at
+
+    uploads_started = [_timestamp(m["started_at"]) for m in job["media"] if m.get("started_at")]
+    uploads_completed = [_timestamp(m["completed_at"]) for m in job["media"] if m.get("completed_at")]
+    if started_at is not None and uploads_started and uploads_completed:
+        stages["generation"] = min(uploads_started) - started_at
+        stages["uploads"] = max(uploads_completed) - min(uploads_started)
+        stages["finalize"] = completed_at - max(uploads_completed)
+
+    return stages
+
+
+async def run(
+    base_url: str,
+    rate: float,
+    duration: float,
+    num_outputs: int,
+    model: str,
+    poll_interval: float,
+    timeout: float
+) -> Dict:
+    outstanding: Dict[int, float] = {}
+    submit_latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    counts = {"accepted": 0, "rejected": 0, "errors": 0, "completed": 0, "failed": 0}
+    total_jobs = int(rate * duration)
+    submitting = True
+
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def _submit(i: int):
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/generate", json={
+                    "model": model,
+                    "prompt": f"load test {i}",
+                    "num_outputs": num_outputs,
+                })
+            except httpx.HTTPError:
+                counts["errors"] += 1
+                return
+            submit_latencies.append(time.perf_counter() - start)
+
+            if response.status_code == 429:
+                counts["rejected"] += 1
+            elif response.is_success:
+                counts["accepted"] += 1
+                outstanding[response.json()["job_id"]] = start
+            else:
+                counts["errors"] += 1
+
+        async def _submit_all():
+            nonlocal submitting
+            start = time.perf_counter()
+            submissions = []
+            for i in range(total_jobs):
+                delay = start + i / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                submissions.append(asyncio.create_task(_submit(i)))
+            await asyncio.gather(*submissions)
+            submitting = False
+
+        async def _poll_all():
+            deadline = None
+            while submitting or outstanding:
+                if not submitting:
+                    deadline = deadline or time.monotonic() + timeout
+                    if time.monotonic() >= deadline:
+                        break
+
+                job_ids = list(outstanding)
+                for offset in range(0, len(job_ids), STATUS_BATCH_SIZE):
+                    response = await client.post(
+                        "/api/v1/status:batch",
+                        json={"job_ids": job_ids[offset:offset + STATUS_BATCH_SIZE]}
+                    )
+                    response.raise_for_status()
+
+                    for job in response.json()["jobs"]:
+                        if job["status"] not in TERMINAL_STATUSES:
+                            continue
+                        del outstanding[job["job_id"]]
+                        counts[job["status"]] += 1
+                        if job["status"] == "completed":
+                            for stage, seconds in stage_timings(job).items():
+                                stages.setdefault(stage, []).append(seconds)
+
+                await asyncio.sleep(poll_interval)
+
+        start = time.perf_counter()
+        await asyncio.gather(_submit_all(), _poll_all())
+        elapsed = time.perf_counter() - start
+
+    return {
+        "benchmark": "load_test",
+        "git_commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "rate": rate,
+            "duration_sec": duration,
+            "num_outputs": num_outputs,
+            "model": model,
+        },
+        "jobs": {"offered": total_jobs, "unfinished": len(outstanding), **counts},
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_jobs_per_sec": round(counts["completed"] / elapsed, 2) if elapsed else 0.0,
+        "submit_latency": summarize(submit_latencies),
+        "stages": {stage: summarize(values) for stage, values in stages.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=10, help="Jobs submitted per second")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to keep submitting")
+    parser.add_argument("--num-outputs", type=int, default=2)
+    parser.add_argument("--model", default="loadtest/model")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for jobs after the last submission")
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(
+        args.base_url, args.rate, args.duration, args.num_outputs,
+        args.model, args.poll_interval, args.timeout
+    ))
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
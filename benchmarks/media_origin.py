@@ -0,0 +1,74 @@
+"""
+Minimal synthetic media origin for benchmarks.
+
+Serves pseudo-random bytes of any requested size without holding the object in
+memory, e.g. GET /media/<size_in_bytes>.bin, with the content type of the extension
+(.jpg, .png, .mp4, ...). The body starts with the request path, so URLs that differ
+only in their query string (/media/1024.bin?id=1) return distinct content and don't
+all collapse into one deduplicated object. The fake media generator serves the same
+bytes in-process with FAKE_MEDIA_SOURCE=synthetic (see app.services.synthetic_media).
+--first-byte-delay-ms holds every response back like a remote CDN would.
+
+Usage:
+    python -m benchmarks.media_origin --port 8090 --first-byte-delay-ms 100
+"""
+import argparse
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.synthetic_media import iter_synthetic_media, parse_synthetic_media_path, synthetic_media_type
+
+logger = logging.getLogger(__name__)
+
+
+class MediaOriginHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    first_byte_delay = 0.0
+
+    def do_GET(self):
+        size = parse_synthetic_media_path(self.path)
+        if size is None:
+            self.send_error(404)
+            return
+
+        if self.first_byte_delay:
+            time.sleep(self.first_byte_delay)
+
+        self.send_response(200)
+        self.send_header("Content-Type", synthetic_media_type(self.path))
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+
+        for chunk in iter_synthetic_media(self.path, size):
+            self.wfile.write(chunk)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def start_media_origin(host: str = "127.0.0.1", port: int = 0, first_byte_delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start the origin on a background thread. Use server.server_address for the bound port."""
+    MediaOriginHandler.first_byte_delay = first_byte_delay
+    server = ThreadingHTTPServer((host, port), MediaOriginHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--first-byte-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    MediaOriginHandler.first_byte_delay = args.first_byte_delay_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), MediaOriginHandler)
+    server.daemon_threads = True
+    print(f"Serving synthetic media on http://{args.host}:{args.port}/media/<bytes>.bin")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
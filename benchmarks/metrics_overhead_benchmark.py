@@ -0,0 +1,97 @@
+"""
+Overhead of the Prometheus instrumentation on the hot paths.
+
+Measures the cost of a single labelled Counter.inc() and Histogram.observe() (what
+each download chunk, S3 call, task start and generator call pays), and the
+per-request overhead of RequestMetricsMiddleware on a trivial FastAPI route,
+compared with the same app without the middleware.
+
+Usage:
+    python -m benchmarks.metrics_overhead_benchmark --iterations 200000 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+import httpx
+from fastapi import FastAPI
+from app.core.metrics import HTTP_REQUEST_DURATION, MEDIA_DOWNLOAD_BYTES, S3_REQUEST_DURATION
+from app.core.middleware import RequestMetricsMiddleware
+from benchmarks.status_latency_benchmark import summarize
+
+
+def _ns_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter_ns() - start) / iterations, 1)
+
+
+def measure_primitives(iterations: int) -> Dict[str, float]:
+    histogram = S3_REQUEST_DURATION.labels(operation="benchmark")
+    return {
+        "counter_inc_ns": _ns_per_call(lambda: MEDIA_DOWNLOAD_BYTES.inc(65536), iterations),
+        "histogram_observe_ns": _ns_per_call(lambda: histogram.observe(0.01), iterations),
+        "histogram_labels_observe_ns": _ns_per_call(
+            lambda: HTTP_REQUEST_DURATION.labels(method="GET", route="/benchmark", status="200").observe(0.01),
+            iterations
+        ),
+    }
+
+
+def _build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    return app
+
+
+async def measure_requests(instrumented: bool, requests: int) -> Dict[str, float]:
+    transport = httpx.ASGITransport(app=_build_app(instrumented))
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for i in range(requests):
+            start = time.perf_counter()
+            response = await client.get(f"/items/{i}")
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    return {"mean_ms": round(sum(latencies) / len(latencies) * 1000, 4), **summarize(latencies)}
+
+
+async def run(iterations: int, requests: int) -> Dict:
+    # Warm up both apps so import and first-request costs don't land in either run
+    await measure_requests(False, 100)
+    await measure_requests(True, 100)
+
+    baseline = await measure_requests(False, requests)
+    instrumented = await measure_requests(True, requests)
+
+    return {
+        "benchmark": "metrics_overhead",
+        "primitives": measure_primitives(iterations),
+        "requests": requests,
+        "baseline": baseline,
+        "instrumented": instrumented,
+        "middleware_overhead_us": round((instrumented["mean_ms"] - baseline["mean_ms"]) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.iterations, args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Job submission cost in direct vs. outbox dispatch mode.
+
+Creates --jobs jobs through the POST /generate handler with --concurrency in flight,
+once per JOB_DISPATCH_MODE, against the configured Postgres and broker:
+
+- direct: each request inserts its job and publishes its workflow to the broker
+- outbox: each request commits its job with an outbox entry, then the outbox
+  dispatcher publishes the workflows in batches of OUTBOX_BATCH_SIZE
+
+Reports request latency, and for the outbox the time the dispatcher needs to drain
+it. Run it with the workers stopped: the published workflows stay in the queues
+and the benchmark jobs are deleted afterwards.
+
+Usage:
+    docker compose stop celery-worker-generation celery-worker-uploads celery-worker-bookkeeping
+    docker compose exec app python -m benchmarks.outbox_benchmark --jobs 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+from app.api.routes import create_generation_job
+from app.core.config import settings
+from app.core.database import init_db, close_db
+from app.models.job import Job
+from app.models.outbox import OutboxEntry
+from app.schemas.job import JobCreateRequest
+from app.services.outbox_dispatcher import outbox_dispatcher
+from benchmarks.status_latency_benchmark import summarize
+
+
+async def submit(jobs: int, concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    job_ids: List[int] = []
+
+    async def _submit(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await create_generation_job(
+                JobCreateRequest(model="benchmark/model", prompt=f"outbox benchmark {i}")
+            )
+            latencies.append(time.perf_counter() - start)
+            job_ids.append(response.job_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_submit(i) for i in range(jobs)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "job_ids": job_ids,
+        "submit_sec": round(elapsed, 3),
+        "submit_jobs_per_sec": round(jobs / elapsed, 2),
+        "request_latency": summarize(latencies),
+    }
+
+
+async def bench_direct(jobs: int, concurrency: int) -> Dict:
+    settings.job_dispatch_mode = "direct"
+    return await submit(jobs, concurrency)
+
+
+async def bench_outbox(jobs: int, concurrency: int) -> Dict:
+    settings.job_dispatch_mode = "outbox"
+    result = await submit(jobs, concurrency)
+
+    # Drain with the dispatcher loop, as a replica would after the burst
+    start = time.perf_counter()
+    while await outbox_dispatcher.dispatch_batch():
+        pass
+    drain = time.perf_counter() - start
+
+    result["dispatch_sec"] = round(drain, 3)
+    result["dispatch_jobs_per_sec"] = round(jobs / drain, 2) if drain else None
+    return result
+
+
+async def run(jobs: int, concurrency: int) -> Dict:
+    # Measure submission only, not admission control
+    settings.admission_control_enabled = False
+
+    await init_db()
+    try:
+        results = {}
+        for mode, bench in (("direct", bench_direct), ("outbox", bench_outbox)):
+            result = await bench(jobs, concurrency)
+            job_ids = result.pop("job_ids")
+            await OutboxEntry.filter(job_id__in=job_ids).delete()
+            await Job.filter(id__in=job_ids).delete()
+            results[mode] = result
+    finally:
+        await close_db()
+
+    return {
+        "benchmark": "outbox",
+        "jobs": jobs,
+        "concurrency": concurrency,
+        "outbox_batch_size": settings.outbox_batch_size,
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.jobs, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
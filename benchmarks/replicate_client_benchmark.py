@@ -0,0 +1,79 @@
+"""
+Predictions in flight per process with the async Replicate client.
+
+Runs --predictions generate_media calls on one event loop against a local Replicate
+stand-in, once awaited one at a time (the throughput of the old blocking client,
+which held the loop for the whole prediction) and once concurrently. Reports wall
+time, predictions per second and the peak in-flight count seen by the stand-in,
+which is bounded by REPLICATE_MAX_CONCURRENT_PREDICTIONS per model.
+
+Usage:
+    python -m benchmarks.replicate_client_benchmark --predictions 50 --latency 1
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+from benchmarks.replicate_standin import start_replicate_standin
+from app.core.config import settings
+from app.services.replicate_service import ReplicateService
+
+
+async def _run_mode(service, store, predictions: int, concurrent: bool) -> Dict:
+    store.reset_stats()
+
+    async def _generate(i: int):
+        return await service.generate_media("benchmark/model", f"replicate client benchmark {i}")
+
+    start = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(*(_generate(i) for i in range(predictions)))
+    else:
+        for i in range(predictions):
+            await _generate(i)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_sec": round(elapsed, 3),
+        "predictions_per_sec": round(predictions / elapsed, 2),
+        "peak_in_flight": store.peak_in_flight,
+    }
+
+
+async def run(predictions: int, latency: float) -> Dict:
+    server = start_replicate_standin(latency, "http://localhost:8090/media/1024.bin")
+    host, port = server.server_address[:2]
+    settings.replicate_api_base_url = f"http://{host}:{port}"
+    settings.replicate_poll_initial_interval = min(settings.replicate_poll_initial_interval, latency / 4)
+    settings.replicate_webhook_url = None
+
+    service = ReplicateService()
+    try:
+        sequential = await _run_mode(service, server.store, predictions, concurrent=False)
+        concurrent = await _run_mode(service, server.store, predictions, concurrent=True)
+    finally:
+        await service.close()
+        server.shutdown()
+
+    return {
+        "benchmark": "replicate_client",
+        "predictions": predictions,
+        "prediction_latency_sec": latency,
+        "max_concurrent_predictions": settings.replicate_max_concurrent_predictions,
+        "sequential": sequential,
+        "concurrent": concurrent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--predictions", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.predictions, args.latency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
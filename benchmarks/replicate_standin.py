@@ -0,0 +1,162 @@
+"""
+Minimal stand-in for the Replicate predictions API.
+
+Implements the endpoints ReplicateService uses (create by model or version, get,
+cancel). Every prediction succeeds after --latency seconds and returns one URL per
+requested output, each --media-url with a unique query string (see media_origin).
+Tracks how many predictions are in flight at once.
+
+Usage:
+    python -m benchmarks.replicate_standin --port 8091 --latency 2
+"""
+import argparse
+import heapq
+import json
+import logging
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+_PREDICTION_PATH = re.compile(r"^/v1/predictions/([^/]+)(/cancel)?$")
+
+
+class PredictionStore:
+    def __init__(self, latency: float, media_url: str):
+        self.latency = latency
+        self.media_url = media_url
+        self._predictions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Completion times of the running predictions
+        self._running: List[float] = []
+        self.created = 0
+        self.peak_in_flight = 0
+
+    def _refresh(self, prediction: Dict):
+        if prediction["status"] == "processing" and time.monotonic() >= prediction["_done_at"]:
+            prediction["status"] = "succeeded"
+            num_outputs = int(prediction["input"].get("num_outputs", 1))
+            separator = "&" if "?" in self.media_url else "?"
+            prediction["output"] = [
+                f"{self.media_url}{separator}prediction={prediction['id']}&output={i}"
+                for i in range(num_outputs)
+            ]
+
+    def in_flight(self) -> int:
+        now = time.monotonic()
+        while self._running and self._running[0] <= now:
+            heapq.heappop(self._running)
+        return len(self._running)
+
+    def create(self, body: Dict) -> Dict:
+        prediction = {
+            "id": uuid4().hex,
+            "version": body.get("version"),
+            "input": body.get("input", {}),
+            "status": "processing",
+            "output": None,
+            "error": None,
+            "_done_at": time.monotonic() + self.latency,
+        }
+        with self._lock:
+            self._predictions[prediction["id"]] = prediction
+            heapq.heappush(self._running, prediction["_done_at"])
+            self.created += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight())
+        return prediction
+
+    def get(self, prediction_id: str, cancel: bool = False):
+        with self._lock:
+            prediction = self._predictions.get(prediction_id)
+            if prediction is not None:
+                self._refresh(prediction)
+                if cancel and prediction["status"] == "processing":
+                    prediction["status"] = "canceled"
+            return prediction
+
+    def reset_stats(self):
+        with self._lock:
+            self.created = 0
+            self.peak_in_flight = 0
+
+
+class ReplicateStandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    store: PredictionStore
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps({k: v for k, v in payload.items() if not k.startswith("_")}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == "/v1/predictions" or re.match(r"^/v1/models/[^/]+/[^/]+/predictions$", self.path):
+            self._send_json(201, self.store.create(body))
+            return
+
+        match = _PREDICTION_PATH.match(self.path)
+        if match and match.group(2):
+            prediction = self.store.get(match.group(1), cancel=True)
+            if prediction is not None:
+                self._send_json(200, prediction)
+                return
+
+        self._send_json(404, {"detail": "Not found"})
+
+    def do_GET(self):
+        match = _PREDICTION_PATH.match(self.path)
+        prediction = self.store.get(match.group(1)) if match and not match.group(2) else None
+
+        if prediction is None:
+            self._send_json(404, {"detail": "Not found"})
+        else:
+            self._send_json(200, prediction)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def start_replicate_standin(
+    latency: float,
+    media_url: str,
+    host: str = "127.0.0.1",
+    port: int = 0
+) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread. The prediction store is on server.store."""
+    store = PredictionStore(latency, media_url)
+    handler = type("Handler", (ReplicateStandinHandler,), {"store": store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.store = store
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--media-url", default="http://localhost:8090/media/1048576.bin")
+    args = parser.parse_args()
+
+    server = start_replicate_standin(args.latency, args.media_url, args.host, args.port)
+    print(f"Serving Replicate stand-in on http://{args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
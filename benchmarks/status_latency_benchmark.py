@@ -0,0 +1,122 @@
+"""
+Latency-under-concurrency benchmark for GET /api/v1/status/{job_id}.
+
+Fires --requests status polls with --concurrency in flight against a running API
+and reports throughput and latency percentiles. Use a completed job with several
+outputs so the first poll exercises the child query and presigned URL generation.
+Later polls of a completed job are served from the job status cache unless it is
+disabled (JOB_STATUS_CACHE_ENABLED=false).
+
+With --revalidate, polls send the ETag of the previous response in If-None-Match,
+like a polling client would, and the 304s are counted. With --db-stats, the
+database transactions committed during the run are read from pg_stat_database
+(DATABASE_URL must reach the API's database).
+
+Usage:
+    python -m benchmarks.status_latency_benchmark --base-url http://localhost:8000 --job-id 1 --revalidate --db-stats
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+import httpx
+from tortoise import connections
+from app.core.database import init_db, close_db
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 2),
+    }
+
+
+async def _committed_transactions() -> int:
+    rows = await connections.get("default").execute_query_dict(
+        "SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()"
+    )
+    return int(rows[0]["xact_commit"])
+
+
+async def run(base_url: str, job_id: int, requests: int, concurrency: int, revalidate: bool, db_stats: bool) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    not_modified = 0
+    etag: Optional[str] = None
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def _poll():
+            nonlocal errors, not_modified, etag
+            async with semaphore:
+                headers = {"If-None-Match": etag} if revalidate and etag else {}
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f"/api/v1/status/{job_id}", headers=headers)
+                    if response.status_code == 304:
+                        not_modified += 1
+                    else:
+                        response.raise_for_status()
+                        etag = response.headers.get("etag")
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        if db_stats:
+            await init_db()
+            transactions = await _committed_transactions()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_poll() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+        result = {
+            "benchmark": "status_latency",
+            "requests": requests,
+            "concurrency": concurrency,
+            "revalidate": revalidate,
+            "errors": errors,
+            "not_modified": not_modified,
+            "requests_per_sec": round(requests / elapsed, 2),
+            **summarize(latencies),
+        }
+
+        if db_stats:
+            # Minus the stats query itself
+            transactions = await _committed_transactions() - transactions - 1
+            result["db_transactions"] = transactions
+            result["db_transactions_per_sec"] = round(transactions / elapsed, 2)
+            await close_db()
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--job-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--revalidate", action="store_true", help="Send If-None-Match with the last ETag")
+    parser.add_argument("--db-stats", action="store_true", help="Report database transactions from pg_stat_database")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(
+        args.base_url, args.job_id, args.requests, args.concurrency, args.revalidate, args.db_stats
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
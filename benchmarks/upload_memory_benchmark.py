@@ -0,0 +1,102 @@
+"""
+Measure peak RSS of StorageService.upload_from_url for a large synthetic object.
+
+Streams an object of --size-mb from a local synthetic origin into the configured
+S3 endpoint (MinIO from docker-compose, or any S3 stand-in such as moto_server)
+while sampling the process RSS. With streaming + multipart uploads the peak
+should stay near (S3_MULTIPART_CONCURRENCY + 1) * S3_MULTIPART_PART_SIZE above
+the baseline, independent of the object size.
+
+Deduplication is disabled by default so the benchmark doesn't need Postgres;
+pass --dedupe to include hashing and the media_objects index lookup.
+
+Usage:
+    S3_ENDPOINT_URL=http://localhost:9000 python -m benchmarks.upload_memory_benchmark --size-mb 1024
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from app.core.config import settings
+from app.core.database import init_db, close_db
+from app.services.storage_service import storage_service
+from benchmarks.media_origin import start_media_origin
+
+
+def _current_rss() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class RSSSampler:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _current_rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def _upload(media_url: str, dedupe: bool) -> str:
+    if dedupe:
+        await init_db()
+    try:
+        return await storage_service.upload_from_url(media_url, job_id=0)
+    finally:
+        await storage_service.close()
+        if dedupe:
+            await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--dedupe", action="store_true")
+    args = parser.parse_args()
+
+    settings.media_dedupe_enabled = args.dedupe
+
+    size = args.size_mb * 1024 * 1024
+    origin = start_media_origin()
+    media_url = f"http://127.0.0.1:{origin.server_address[1]}/media/{size}.bin"
+
+    baseline = _current_rss()
+    start = time.perf_counter()
+    with RSSSampler() as sampler:
+        s3_key = asyncio.run(_upload(media_url, args.dedupe))
+    elapsed = time.perf_counter() - start
+    origin.shutdown()
+
+    storage_service.s3_client.delete_object(Bucket=storage_service.bucket_name, Key=s3_key)
+
+    print(json.dumps({
+        "benchmark": "upload_memory",
+        "object_bytes": size,
+        "part_size": settings.s3_multipart_part_size,
+        "part_concurrency": settings.s3_multipart_concurrency,
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": sampler.peak,
+        "peak_rss_delta_bytes": sampler.peak - baseline,
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_mb_per_sec": round(args.size_mb / elapsed, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
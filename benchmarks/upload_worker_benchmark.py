@@ -0,0 +1,208 @@
+"""
+Upload worker memory and throughput: prefork pool vs. the threads pool.
+
+Starts an uploads worker (celery worker -Q uploads) once per --pools entry with
+--concurrency uploads in flight, and runs --uploads persist_media_to_s3 tasks through
+it. The media comes from a local synthetic origin (--size-kb objects, held back by
+--first-byte-delay-ms like a remote CDN), so the uploads are network bound as in
+production:
+
+- prefork: one process per upload in flight, each with its own event loop,
+  database pool and HTTP/S3 clients
+- threads: one process whose pool threads share a single event loop and its
+  clients (see worker_lifecycle)
+
+Reports uploads per second and the worker's memory while busy, as the peak PSS of
+the worker and all its pool processes (PSS splits pages shared after the fork
+between the processes, so the sum is not inflated by them).
+
+Needs the configured Postgres, broker and S3 endpoint, and no other uploads worker
+consuming the queue.
+
+Usage:
+    python -m benchmarks.upload_worker_benchmark --uploads 400 --concurrency 32 --size-kb 256
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+from app.core.database import init_db, close_db
+from app.models.job import Job, JobStatus
+from app.tasks.celery_app import UPLOADS_QUEUE, celery_app
+from app.tasks.media_generation import persist_media_to_s3
+from benchmarks.media_origin import start_media_origin
+
+
+def _process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                pids += _process_tree(int(child))
+    except OSError:
+        pass
+    return pids
+
+
+def _tree_pss(pid: int) -> int:
+    total = 0
+    for process in _process_tree(pid):
+        try:
+            with open(f"/proc/{process}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class PSSSampler:
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _tree_pss(self.pid))
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _start_worker(pool: str, concurrency: int) -> subprocess.Popen:
+    hostname = f"upload-benchmark-{pool}@%h"
+    worker = subprocess.Popen(
+        [
+            sys.executable, "-m", "celery", "-A", "app.tasks.celery_app", "worker",
+            "-Q", UPLOADS_QUEUE, "-P", pool, f"--concurrency={concurrency}",
+            "-n", hostname, "--loglevel=warning", "--without-gossip", "--without-mingle",
+        ],
+        env={**os.environ, "WORKER_METRICS_PORT": "0"},
+    )
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if celery_app.control.ping(timeout=1.0):
+            return worker
+    worker.terminate()
+    raise RuntimeError(f"The {pool} worker didn't come up")
+
+
+async def _create_jobs(uploads: int) -> Dict:
+    """One parent job, and a child job per upload. Returns the parent and its children."""
+    parent = await Job.create(
+        celery_task_id=f"benchmark_upload_{time.time_ns()}",
+        model="benchmark",
+        prompt="upload worker benchmark",
+        num_outputs=uploads,
+    )
+    await Job.bulk_create([
+        Job(
+            celery_task_id=f"benchmark_upload_{parent.id}_{i}",
+            parent_id=parent.id,
+            model="",
+            prompt="",
+            num_outputs=0,
+            media=[{"media_url": f"upload-{i}"}],
+        )
+        for i in range(uploads)
+    ])
+    child_job_ids = await Job.filter(parent_id=parent.id).order_by("id").values_list("id", flat=True)
+    return {"parent_id": parent.id, "child_job_ids": list(child_job_ids)}
+
+
+async def _finished(parent_id: int) -> int:
+    return await Job.filter(parent_id=parent_id, status__in=[JobStatus.COMPLETED, JobStatus.FAILED]).count()
+
+
+async def _delete_jobs(parent_id: int):
+    await Job.filter(parent_id=parent_id).delete()
+    await Job.filter(id=parent_id).delete()
+
+
+async def bench(pool: str, uploads: int, concurrency: int, origin_url: str, size: int) -> Dict:
+    jobs = await _create_jobs(uploads)
+    parent_id = jobs["parent_id"]
+
+    worker = await asyncio.to_thread(_start_worker, pool, concurrency)
+    try:
+        idle_pss = _tree_pss(worker.pid)
+        with PSSSampler(worker.pid) as sampler:
+            start = time.perf_counter()
+            for i, child_job_id in enumerate(jobs["child_job_ids"]):
+                persist_media_to_s3.apply_async(
+                    (f"{origin_url}/media/{size}.bin?pool={pool}&upload={i}&run={parent_id}", parent_id, child_job_id)
+                )
+
+            while (finished := await _finished(parent_id)) < uploads:
+                await asyncio.sleep(0.1)
+            elapsed = time.perf_counter() - start
+
+        failed = await Job.filter(parent_id=parent_id, status=JobStatus.FAILED).count()
+    finally:
+        worker.terminate()
+        await asyncio.to_thread(worker.wait)
+        await _delete_jobs(parent_id)
+
+    return {
+        "uploads_per_sec": round(finished / elapsed, 2),
+        "failed": failed,
+        "idle_pss_bytes": idle_pss,
+        "peak_pss_bytes": sampler.peak,
+        "peak_pss_per_upload_in_flight_bytes": round(sampler.peak / concurrency),
+    }
+
+
+async def run(pools: List[str], uploads: int, concurrency: int, size_kb: int, first_byte_delay_ms: float) -> Dict:
+    origin = start_media_origin(first_byte_delay=first_byte_delay_ms / 1000)
+    origin_url = f"http://127.0.0.1:{origin.server_address[1]}"
+
+    await init_db()
+    try:
+        results = {pool: await bench(pool, uploads, concurrency, origin_url, size_kb * 1024) for pool in pools}
+    finally:
+        await close_db()
+        origin.shutdown()
+
+    return {
+        "benchmark": "upload_worker",
+        "uploads": uploads,
+        "concurrency": concurrency,
+        "size_kb": size_kb,
+        "first_byte_delay_ms": first_byte_delay_ms,
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--first-byte-delay-ms", type=float, default=100.0)
+    parser.add_argument("--pools", default="prefork,threads", help="Comma separated worker pools to compare")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(
+        args.pools.split(","), args.uploads, args.concurrency, args.size_kb, args.first_byte_delay_ms
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark task throughput with a per-task event loop vs. the persistent worker loop.
+
+Runs a representative task body (a primary key lookup plus a status update on a
+scratch job) N times in each mode against the configured DATABASE_URL:
+
+- per-task:   asyncio.run() + Tortoise.init() + Tortoise.close_connections() per task
+              (the pre-worker-lifecycle behaviour)
+- persistent: run_async() on the long-lived worker loop with a pooled connection
+
+Usage:
+    python -m benchmarks.worker_loop_benchmark --iterations 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from tortoise import Tortoise
+from app.core.database import TORTOISE_ORM, init_db, close_db
+from app.models.job import Job, JobStatus
+from app.tasks import worker_lifecycle
+
+
+async def _task_body(job_id: int):
+    job = await Job.get(id=job_id)
+    await job.update_from_dict({"status": JobStatus.PROCESSING, "started_at": datetime.utcnow()})
+    await job.save()
+
+
+async def _per_task_body(job_id: int):
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        await _task_body(job_id)
+    finally:
+        await Tortoise.close_connections()
+
+
+async def _create_scratch_job() -> int:
+    await init_db()
+    try:
+        job = await Job.create(
+            celery_task_id=f"benchmark_{time.time_ns()}",
+            model="benchmark",
+            prompt="benchmark",
+        )
+        return job.id
+    finally:
+        await close_db()
+
+
+async def _delete_scratch_job(job_id: int):
+    await init_db()
+    try:
+        await Job.filter(id=job_id).delete()
+    finally:
+        await close_db()
+
+
+def bench_per_task(job_id: int, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        asyncio.run(_per_task_body(job_id))
+    return iterations / (time.perf_counter() - start)
+
+
+def bench_persistent(job_id: int, iterations: int) -> float:
+    worker_lifecycle.init_worker_process()
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            worker_lifecycle.run_async(_task_body(job_id))
+        return iterations / (time.perf_counter() - start)
+    finally:
+        worker_lifecycle.shutdown_worker_process()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    job_id = asyncio.run(_create_scratch_job())
+    try:
+        per_task = bench_per_task(job_id, args.iterations)
+        persistent = bench_persistent(job_id, args.iterations)
+    finally:
+        asyncio.run(_delete_scratch_job(job_id))
+
+    print(json.dumps({
+        "benchmark": "worker_loop",
+        "iterations": args.iterations,
+        "per_task_tasks_per_sec": round(per_task, 2),
+        "persistent_tasks_per_sec": round(persistent, 2),
+        "speedup": round(persistent / per_task, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+End-to-end job latency of the chord and fused workflow modes.
+
+Creates --jobs jobs per mode, starts each with start_media_generation_workflow(mode=...)
+one every --interval seconds, and waits for all of them to finish. Job latency is
+completed_at - created_at, so it includes queueing, every broker hop and the chord
+unlock polling of the chord mode.
+
+Needs the database, Redis and running Celery workers (e.g. docker compose), with
+MEDIA_GENERATOR_PROVIDER=fake so provider latency doesn't dominate.
+
+Usage:
+    docker compose exec app python -m benchmarks.workflow_mode_benchmark --jobs 200 --num-outputs 3
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+from uuid import uuid4
+from app.core.database import init_db, close_db
+from app.models.job import Job, JobStatus
+from app.tasks.media_generation import start_media_generation_workflow
+from benchmarks.status_latency_benchmark import summarize
+
+TERMINAL_STATUSES = [JobStatus.COMPLETED, JobStatus.FAILED]
+
+
+async def run_mode(mode: str, jobs: int, num_outputs: int, interval: float, timeout: float) -> Dict:
+    job_ids: List[int] = []
+
+    start = time.perf_counter()
+    for i in range(jobs):
+        job = await Job.create(
+            model="benchmark/model",
+            prompt=f"workflow mode benchmark {mode} {i}",
+            num_outputs=num_outputs,
+            celery_task_id=str(uuid4())
+        )
+        start_media_generation_workflow(job.id, task_id=job.celery_task_id, mode=mode)
+        job_ids.append(job.id)
+        await asyncio.sleep(interval)
+
+    deadline = time.monotonic() + timeout
+    while await Job.filter(id__in=job_ids, status__not_in=TERMINAL_STATUSES).exists():
+        if time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(0.5)
+    elapsed = time.perf_counter() - start
+
+    finished = await Job.filter(id__in=job_ids, status__in=TERMINAL_STATUSES)
+    latencies = [
+        (job.completed_at - job.created_at).total_seconds()
+        for job in finished
+        if job.status == JobStatus.COMPLETED and job.completed_at is not None
+    ]
+
+    return {
+        "mode": mode,
+        "jobs": jobs,
+        "completed": len(latencies),
+        "failed": sum(1 for job in finished if job.status == JobStatus.FAILED),
+        "unfinished": jobs - len(finished),
+        "elapsed_sec": round(elapsed, 3),
+        "job_latency": summarize(latencies),
+    }
+
+
+async def run(modes: List[str], jobs: int, num_outputs: int, interval: float, timeout: float) -> Dict:
+    await init_db()
+    try:
+        results = [await run_mode(mode, jobs, num_outputs, interval, timeout) for mode in modes]
+    finally:
+        await close_db()
+
+    return {"benchmark": "workflow_mode", "num_outputs": num_outputs, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["chord", "fused"], choices=["chord", "fused"])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--num-outputs", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.modes, args.jobs, args.num_outputs, args.interval, args.timeout)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "media_objects" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "sha256" VARCHAR(64) NOT NULL UNIQUE,
+    "s3_key" TEXT NOT NULL,
+    "size" BIGINT NOT NULL,
+    "content_type" VARCHAR(255),
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "media_objects" IS 'Content-addressed index of media stored in S3, used to skip re-uploading identical bytes.';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "media_objects";"""
@@ -0,0 +1,36 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Retries of the old per-URL child creation could leave duplicate children of a parent
+    # for the same media url. Each group keeps its lowest id, which takes over the state of
+    # its most advanced duplicate (a completed one if any), and the others are dropped.
+    return """
+        CREATE TEMPORARY TABLE "duplicate_child_jobs" AS
+        SELECT "id",
+               MIN("id") OVER "child_group" AS "keep_id",
+               ROW_NUMBER() OVER ("child_group" ORDER BY "status" = 'completed' DESC, "id") AS "rank"
+        FROM "jobs"
+        WHERE "parent_id" IS NOT NULL AND "media"->0->>'media_url' IS NOT NULL
+        WINDOW "child_group" AS (PARTITION BY "parent_id", MD5("media"->0->>'media_url'));
+        UPDATE "jobs" AS "kept" SET
+            "status" = "best"."status",
+            "media" = "best"."media",
+            "error_message" = "best"."error_message",
+            "retry_count" = "best"."retry_count",
+            "started_at" = "best"."started_at",
+            "completed_at" = "best"."completed_at",
+            "updated_at" = "best"."updated_at"
+        FROM "duplicate_child_jobs" JOIN "jobs" AS "best" ON "best"."id" = "duplicate_child_jobs"."id"
+        WHERE "duplicate_child_jobs"."rank" = 1
+          AND "kept"."id" = "duplicate_child_jobs"."keep_id"
+          AND "kept"."id" <> "best"."id";
+        DELETE FROM "jobs" USING "duplicate_child_jobs"
+        WHERE "jobs"."id" = "duplicate_child_jobs"."id" AND "duplicate_child_jobs"."id" <> "duplicate_child_jobs"."keep_id";
+        DROP TABLE "duplicate_child_jobs";
+        CREATE UNIQUE INDEX IF NOT EXISTS "uidx_jobs_parent_media_url" ON "jobs" ("parent_id", MD5("media"->0->>'media_url')) WHERE "parent_id" IS NOT NULL;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "uidx_jobs_parent_media_url";"""
@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_jobs_parent__ac0ea3" ON "jobs" ("parent_id");
+        CREATE INDEX IF NOT EXISTS "idx_jobs_status_4f4765" ON "jobs" ("status", "created_at");
+        CREATE INDEX IF NOT EXISTS "idx_jobs_parent__5f6125" ON "jobs" ("parent_id", "status");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_jobs_parent__ac0ea3";
+        DROP INDEX IF EXISTS "idx_jobs_status_4f4765";
+        DROP INDEX IF EXISTS "idx_jobs_parent__5f6125";"""
@@ -0,0 +1,18 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "workflow_outbox" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "job_id" INT NOT NULL,
+    "task_id" VARCHAR(255) NOT NULL,
+    "priority" INT,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "workflow_outbox" IS 'Workflow dispatch committed together with its job, published to Celery by the outbox dispatcher.';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "workflow_outbox";"""